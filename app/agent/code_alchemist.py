@@ -18,13 +18,15 @@ class CodeAlchemistAgent(ToolCallAgent):
     next_step_prompt: str = NEXT_STEP_PROMPT
 
     # Tool configuration
-    available_tools: ToolCollection = ToolCollection(
-        Bash(),
-        WriteCode(),
-        RefineCode(),
-        View(),
-        ListFiles(),
-        AttemptCompletion()
+    available_tools: ToolCollection = Field(
+        default_factory=lambda: ToolCollection(
+            Bash(),
+            WriteCode(),
+            RefineCode(),
+            View(),
+            ListFiles(),
+            AttemptCompletion(),
+        )
     )
     special_tool_names: List[str] = Field(
         default_factory=lambda: [AttemptCompletion().name]
@@ -17,8 +17,12 @@ class CodeActAgent(ToolCallAgent):
     system_prompt: str = SYSTEM_PROMPT
     next_step_prompt: str = NEXT_STEP_PROMPT
 
-    available_tools: ToolCollection = ToolCollection(
-        Bash(), OHEditor(), Finish()
+    available_tools: ToolCollection = Field(
+        default_factory=lambda: ToolCollection(
+            Bash(),
+            OHEditor(),
+            Finish(),
+        )
     )
     special_tool_names: List[str] = Field(default_factory=lambda: [Finish().name])
 
@@ -22,12 +22,14 @@ class MidwitAgent(ToolCallAgent):
     system_prompt: str = SYSTEM_PROMPT
     next_step_prompt: str = NEXT_STEP_PROMPT
 
-    available_tools: ToolCollection = ToolCollection(
-        Bash(),
-        StrReplaceEditor(),
-        SearchFile(),
-        ListFiles(),
-        AttemptCompletion(),
+    available_tools: ToolCollection = Field(
+        default_factory=lambda: ToolCollection(
+            Bash(),
+            StrReplaceEditor(),
+            SearchFile(),
+            ListFiles(),
+            AttemptCompletion(),
+        )
     )
     special_tool_names: List[str] = Field(
         default_factory=lambda: [AttemptCompletion().name]
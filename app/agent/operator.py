@@ -16,9 +16,11 @@ class Operator(ToolCallAgent):
     system_prompt: str = SYSTEM_PROMPT
     next_step_prompt: str = NEXT_STEP_PROMPT
 
-    available_tools: ToolCollection = ToolCollection(
-        BrowserUseTool(),
-        Finish()
+    available_tools: ToolCollection = Field(
+        default_factory=lambda: ToolCollection(
+            BrowserUseTool(),
+            Finish(),
+        )
     )
 
     special_tool_names: List[str] = Field(default_factory=lambda: [Finish().name])
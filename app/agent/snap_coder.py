@@ -18,11 +18,13 @@ class SnapCoder(ToolCallAgent):
     system_prompt: str = SYSTEM_PROMPT
     next_step_prompt: str = NEXT_STEP_PROMPT
 
-    available_tools: ToolCollection = ToolCollection(
-        Bash(),
-        OHEditor(),
-        ScreenshotToCodeTool(),
-        Finish()
+    available_tools: ToolCollection = Field(
+        default_factory=lambda: ToolCollection(
+            Bash(),
+            OHEditor(),
+            ScreenshotToCodeTool(),
+            Finish(),
+        )
     )
 
     special_tool_names: List[str] = Field(default_factory=lambda: [Finish().name])
@@ -1,12 +1,19 @@
+import re
 from typing import List
 
 from pydantic import Field
 
 from app.agent.toolcall import ToolCallAgent
 from app.prompt.swe import NEXT_STEP_TEMPLATE, SYSTEM_PROMPT
+from app.schema import ToolCall
 from app.tool import Bash, Finish, StrReplaceEditor, ToolCollection
 
 
+# Shell commands that can move the working directory
+_CD_RE = re.compile(r"\b(?:cd|pushd|popd)\b")
+_BASH_NAME = Bash().name
+
+
 class SWEAgent(ToolCallAgent):
     """An agent that implements the SWEAgent paradigm for executing code and natural conversations."""
 
@@ -14,10 +21,15 @@ class SWEAgent(ToolCallAgent):
     description: str = "an autonomous AI programmer that interacts directly with the computer to solve tasks."
 
     system_prompt: str = SYSTEM_PROMPT
-    next_step_prompt: str = NEXT_STEP_TEMPLATE
-
-    available_tools: ToolCollection = ToolCollection(
-        Bash(), StrReplaceEditor(), Finish()
+    next_step_template: str = NEXT_STEP_TEMPLATE
+    next_step_prompt: str = ""
+
+    available_tools: ToolCollection = Field(
+        default_factory=lambda: ToolCollection(
+            Bash(),
+            StrReplaceEditor(),
+            Finish(),
+        )
     )
     special_tool_names: List[str] = Field(default_factory=lambda: [Finish().name])
 
@@ -25,13 +37,26 @@ class SWEAgent(ToolCallAgent):
 
     bash: Bash = Field(default_factory=Bash)
     working_dir: str = "."
+    # Set until the working directory and prompt have been computed for the current cwd
+    cwd_dirty: bool = True
 
     async def think(self) -> bool:
         """Process current state and decide next action"""
-        # Update working directory
-        self.working_dir = await self.bash.execute("pwd")
-        self.next_step_prompt = self.next_step_prompt.format(
-            current_dir=self.working_dir
-        )
+        # Only ask the shell again when the last step may have changed directory
+        if self.cwd_dirty or self._changes_directory(self.tool_calls):
+            self.working_dir = await self.bash.execute("pwd")
+            self.next_step_prompt = self.next_step_template.format(
+                current_dir=self.working_dir
+            )
+            self.cwd_dirty = False
 
         return await super().think()
+
+    @staticmethod
+    def _changes_directory(tool_calls: List[ToolCall]) -> bool:
+        """Check if any bash call may have changed the working directory"""
+        return any(
+            call.function.name == _BASH_NAME
+            and _CD_RE.search(call.function.arguments or "")
+            for call in tool_calls or []
+        )
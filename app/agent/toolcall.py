@@ -1,3 +1,4 @@
+import asyncio
 import json
 from typing import Any, List, Literal
 
@@ -9,8 +10,21 @@ from app.prompt.toolcall import NEXT_STEP_PROMPT, SYSTEM_PROMPT
 from app.schema import AgentState, Message, ToolCall
 from app.tool import CreateChatCompletion, Terminate, ToolCollection
 
+try:
+    # orjson decodes tool-call arguments (often whole files for editors) several times faster;
+    # its JSONDecodeError subclasses json's, so the handlers below catch both
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
 TOOL_CALL_REQUIRED = "Tool calls required but none provided"
 
+# Tools that only read files; consecutive calls to them are executed concurrently.
+# web_read is not listed: one WebRead instance drives a single browser page.
+PARALLEL_SAFE_TOOLS = frozenset({"view", "search_files", "list_files", "show_repo_structure"})
+# Read-only commands of tools that otherwise modify files
+PARALLEL_SAFE_COMMANDS = {"str_replace_editor": frozenset({"view"})}
+
 
 class ToolCallAgent(ReActAgent):
     """Base agent class for handling tool/function calls with enhanced abstraction"""
@@ -21,8 +35,11 @@ class ToolCallAgent(ReActAgent):
     system_prompt: str = SYSTEM_PROMPT
     next_step_prompt: str = NEXT_STEP_PROMPT
 
-    available_tools: ToolCollection = ToolCollection(
-        CreateChatCompletion(), Terminate()
+    available_tools: ToolCollection = Field(
+        default_factory=lambda: ToolCollection(
+            CreateChatCompletion(),
+            Terminate(),
+        )
     )
     tool_choices: Literal["none", "auto", "required"] = "auto"
     special_tool_names: List[str] = Field(default_factory=lambda: [Terminate().name])
@@ -98,21 +115,55 @@ class ToolCallAgent(ReActAgent):
             )
 
         results = []
-        for command in self.tool_calls:
-            result = await self.execute_tool(command)
-            logger.info(
-                f"Executed tool {command.function.name} with result: {result}"
-            )
+        tool_msgs = []
+        start = 0
+        while start < len(self.tool_calls):
+            # Run each run of read-only calls together; anything else runs on its own
+            end = start + 1
+            if self._is_parallel_safe(self.tool_calls[start]):
+                while end < len(self.tool_calls) and self._is_parallel_safe(self.tool_calls[end]):
+                    end += 1
+            batch = self.tool_calls[start:end]
+            start = end
+
+            if len(batch) == 1:
+                batch_results = [await self.execute_tool(batch[0])]
+            else:
+                batch_results = await asyncio.gather(*(self.execute_tool(c) for c in batch))
+
+            # Results are recorded in the order the calls were made
+            for command, result in zip(batch, batch_results):
+                logger.info(
+                    f"Executed tool {command.function.name} with result: {result}"
+                )
 
-            # Add tool response to memory
-            tool_msg = Message.tool_message(
-                content=result, tool_call_id=command.id, name=command.function.name
-            )
-            self.memory.add_message(tool_msg)
-            results.append(result)
+                tool_msgs.append(
+                    Message.tool_message(
+                        content=result, tool_call_id=command.id, name=command.function.name
+                    )
+                )
+                results.append(result)
 
+        # Add all tool responses to memory at once
+        self.memory.add_messages(tool_msgs)
         return "\n\n".join(results)
 
+    @staticmethod
+    def _is_parallel_safe(command: ToolCall) -> bool:
+        """Check if a tool call only reads state and may run alongside others"""
+        if not command or not command.function:
+            return False
+        name = command.function.name
+        if name in PARALLEL_SAFE_TOOLS:
+            return True
+        if name not in PARALLEL_SAFE_COMMANDS:
+            return False
+        try:
+            args = _json_loads(command.function.arguments or "{}")
+        except json.JSONDecodeError:
+            return False
+        return isinstance(args, dict) and args.get("command") in PARALLEL_SAFE_COMMANDS[name]
+
     async def execute_tool(self, command: ToolCall) -> str:
         """Execute a single tool call with robust error handling"""
         if not command or not command.function or not command.function.name:
@@ -124,7 +175,7 @@ class ToolCallAgent(ReActAgent):
 
         try:
             # Parse arguments
-            args = json.loads(command.function.arguments or "{}")
+            args = _json_loads(command.function.arguments or "{}")
 
             # Execute the tool
             result = await self.available_tools.execute(name=name, tool_input=args)
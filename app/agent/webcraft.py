@@ -19,12 +19,14 @@ class WebCraftAgent(ToolCallAgent):
     system_prompt: str = SYSTEM_PROMPT
     next_step_prompt: str = NEXT_STEP_PROMPT
 
-    available_tools: ToolCollection = ToolCollection(
-        CreateWebTemplate(),
-        DeployWebProject(),
-        Bash(),
-        OHEditor(),
-        Finish()
+    available_tools: ToolCollection = Field(
+        default_factory=lambda: ToolCollection(
+            CreateWebTemplate(),
+            DeployWebProject(),
+            Bash(),
+            OHEditor(),
+            Finish(),
+        )
     )
 
     special_tool_names: List[str] = Field(default_factory=lambda: [Finish().name])
@@ -1,3 +1,4 @@
+import importlib
 import json
 import logging
 import os
@@ -10,7 +11,6 @@ from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 
 # Import AgentHub components
-from app.agent import ToolCallAgent, CodeActAgent, SWEAgent, MidwitAgent
 from app.config import config
 from app.logger import logger
 from app.schema import AgentState
@@ -77,20 +77,23 @@ class TaskResult(BaseModel):
     metrics: Optional[Dict[str, Any]] = None
 
 
+# Agent classes by type, as (module, class name); a module is imported on first use
+AGENT_CLASSES = {
+    "toolcall": ("app.agent.toolcall", "ToolCallAgent"),
+    "codeact": ("app.agent.codeact", "CodeActAgent"),
+    "swe": ("app.agent.swe", "SWEAgent"),
+    "midwit": ("app.agent.midwit", "MidwitAgent"),
+}
+
+
 # Helper functions
 def get_agent_class(agent_type: str):
     """Get agent class based on type string"""
-    agent_map = {
-        "toolcall": ToolCallAgent,
-        "codeact": CodeActAgent,
-        "swe": SWEAgent,
-        "midwit": MidwitAgent,
-    }
-
-    if agent_type not in agent_map:
+    if agent_type not in AGENT_CLASSES:
         raise HTTPException(status_code=400, detail=f"Unknown agent type: {agent_type}")
 
-    return agent_map[agent_type]
+    module, name = AGENT_CLASSES[agent_type]
+    return getattr(importlib.import_module(module), name)
 
 
 async def run_agent_task(agent_id: str, agent, task: str):
@@ -0,0 +1,104 @@
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Any, List, Optional
+
+import numpy as np
+
+
+class LLMCache:
+    """In-memory LRU cache for LLM responses, keyed on the exact prompt and model."""
+
+    def __init__(self, max_size: int = 1000):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0}
+
+    @staticmethod
+    def make_messages_key(
+        model: str, messages: List[Any], temperature: Optional[float] = None
+    ) -> str:
+        """Build a stable cache key for a full message list (including any image parts)."""
+        payload = json.dumps(
+            {"model": model, "messages": messages, "temperature": temperature},
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for key, or None on a miss."""
+        response = self._entries.get(key)
+        if response is None:
+            self.stats["misses"] += 1
+        else:
+            self.stats["hits"] += 1
+            self._entries.move_to_end(key)
+        return response
+
+    def set(self, key: str, response: str) -> None:
+        """Store a response, evicting the least recently used entry when full."""
+        self._entries[key] = response
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SemanticCache:
+    """
+    Cache that returns a stored response when a new query embedding is close
+    enough (cosine similarity) to one seen before.
+    """
+
+    def __init__(self, threshold: float = 0.92, max_size: int = 1000):
+        self.threshold = threshold
+        self.max_size = max_size
+        self._embeddings: Optional[np.ndarray] = None
+        self._norms: Optional[np.ndarray] = None
+        self._responses: List[str] = []
+
+    def get(self, embedding: List[float]) -> Optional[str]:
+        """Return the response of the most similar stored query above the threshold."""
+        if self._embeddings is None:
+            return None
+
+        query = np.asarray(embedding, dtype=np.float32)
+        query_norm = np.linalg.norm(query)
+        if query_norm == 0:
+            return None
+
+        similarities = self._embeddings @ query / (self._norms * query_norm)
+        best = int(np.argmax(similarities))
+        if similarities[best] >= self.threshold:
+            return self._responses[best]
+        return None
+
+    def set(self, embedding: List[float], response: str) -> None:
+        """Store a response, dropping the oldest entry when full."""
+        row = np.asarray(embedding, dtype=np.float32)[np.newaxis, :]
+        norm = np.linalg.norm(row, axis=1)
+        if self._embeddings is None:
+            self._embeddings, self._norms = row, norm
+        else:
+            self._embeddings = np.vstack((self._embeddings, row))
+            self._norms = np.concatenate((self._norms, norm))
+        self._responses.append(response)
+
+        if len(self._responses) > self.max_size:
+            self._embeddings = self._embeddings[1:]
+            self._norms = self._norms[1:]
+            self._responses.pop(0)
+
+    def clear(self) -> None:
+        self._embeddings = None
+        self._norms = None
+        self._responses.clear()
+
+    def __len__(self) -> int:
+        return len(self._responses)
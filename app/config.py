@@ -23,6 +23,9 @@ class LLMSettings(BaseModel):
         4096, description="Maximum number of tokens per request"
     )
     temperature: float = Field(1.0, description="Sampling temperature")
+    embedding_model: str = Field(
+        "text-embedding-3-small", description="Embedding model name"
+    )
 
 
 class ScreenshotSettings(BaseModel):
@@ -130,6 +133,7 @@ class Config:
             "api_key": base_llm.get("api_key"),
             "max_tokens": base_llm.get("max_tokens", 4096),
             "temperature": base_llm.get("temperature", 1.0),
+            "embedding_model": base_llm.get("embedding_model", "text-embedding-3-small"),
         }
 
         config_dict = {
@@ -1,4 +1,4 @@
-from typing import List, Literal, Optional, Dict, Union
+from typing import AsyncIterator, List, Literal, Optional, Dict, Union
 
 from openai import AsyncOpenAI, OpenAIError, AuthenticationError, RateLimitError, APIError
 from tenacity import retry, stop_after_attempt, wait_random_exponential
@@ -10,6 +10,8 @@ from app.logger import logger  # Assuming a logger is set up in your app
 
 class LLM:
     _instances: Dict[str, "LLM"] = {}
+    # Config names that resolve to the same endpoint share one client and its connection pool
+    _clients: Dict[tuple, AsyncOpenAI] = {}
 
     def __new__(cls, config_name: str = "default", llm_config: Optional[LLMSettings] = None):
         if config_name not in cls._instances:
@@ -25,7 +27,16 @@ class LLM:
             self.model = llm_config.model
             self.max_tokens = llm_config.max_tokens
             self.temperature = llm_config.temperature
-            self.client = AsyncOpenAI(api_key=llm_config.api_key, base_url=llm_config.base_url)
+            self.embedding_model = llm_config.embedding_model
+            self.client = self.get_client(llm_config.api_key, llm_config.base_url)
+
+    @classmethod
+    def get_client(cls, api_key: str, base_url: str) -> AsyncOpenAI:
+        """Return the shared AsyncOpenAI client for an endpoint, creating it on first use."""
+        key = (api_key, base_url)
+        if key not in cls._clients:
+            cls._clients[key] = AsyncOpenAI(api_key=api_key, base_url=base_url)
+        return cls._clients[key]
 
     @staticmethod
     def format_messages(messages: List[Union[dict, Message]]) -> List[dict]:
@@ -153,6 +164,93 @@ class LLM:
             logger.error(f"Unexpected error in ask: {e}")
             raise
 
+    async def ask_stream(
+        self,
+        messages: List[Union[dict, Message]],
+        system_msgs: Optional[List[Union[dict, Message]]] = None,
+        temperature: Optional[float] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Send a prompt to the LLM and yield the response text as it arrives.
+
+        Args:
+            messages: List of conversation messages
+            system_msgs: Optional system messages to prepend
+            temperature (float): Sampling temperature for the response
+
+        Yields:
+            str: Chunks of the generated response
+
+        Raises:
+            ValueError: If messages are invalid
+            OpenAIError: If API call fails
+        """
+        try:
+            if system_msgs:
+                system_msgs = self.format_messages(system_msgs)
+                messages = system_msgs + self.format_messages(messages)
+            else:
+                messages = self.format_messages(messages)
+
+            response = await self._create_stream(messages, temperature)
+
+            async for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+        except ValueError as ve:
+            logger.error(f"Validation error in ask_stream: {ve}")
+            raise
+        except OpenAIError as oe:
+            logger.error(f"OpenAI API error in ask_stream: {oe}")
+            raise
+
+    @retry(
+        wait=wait_random_exponential(min=1, max=60),
+        stop=stop_after_attempt(6),
+    )
+    async def _create_stream(self, messages: List[dict], temperature: Optional[float] = None):
+        """
+        Open a streaming completion, retrying transient API errors like `ask` does.
+
+        Only the request is retried; once chunks have been yielded a failure propagates,
+        since the caller has already consumed part of the response.
+        """
+        return await self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            max_tokens=self.max_tokens,
+            temperature=temperature or self.temperature,
+            stream=True,
+        )
+
+    @retry(
+        wait=wait_random_exponential(min=1, max=60),
+        stop=stop_after_attempt(6),
+    )
+    async def embed(self, text: str) -> List[float]:
+        """
+        Get the embedding vector of a text.
+
+        Args:
+            text: The text to embed
+
+        Returns:
+            List[float]: The embedding vector
+
+        Raises:
+            OpenAIError: If API call fails after retries
+        """
+        try:
+            response = await self.client.embeddings.create(
+                model=self.embedding_model,
+                input=text,
+            )
+            return response.data[0].embedding
+        except OpenAIError as oe:
+            logger.error(f"OpenAI API error in embed: {oe}")
+            raise
+
     @retry(
         wait=wait_random_exponential(min=1, max=60),
         stop=stop_after_attempt(6),
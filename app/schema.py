@@ -116,8 +116,10 @@ class Memory(BaseModel):
             self.messages = self.messages[-self.max_messages:]
 
     def add_messages(self, messages: List[Message]) -> None:
-        """Add multiple messages to memory"""
+        """Add multiple messages to memory, applying the message limit once"""
         self.messages.extend(messages)
+        if len(self.messages) > self.max_messages:
+            self.messages = self.messages[-self.max_messages:]
 
     def clear(self) -> None:
         """Clear all messages"""
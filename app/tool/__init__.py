@@ -1,19 +1,35 @@
-from app.tool.attempt_completion_client_request import AttemptCompletion
-from app.tool.base import BaseTool
-from app.tool.bash import Bash
-from app.tool.code_review import CodeReview
-from app.tool.create_chat_completion import CreateChatCompletion
-from app.tool.create_tool import CreateTool
-from app.tool.file_navigator import FileNavigator
-from app.tool.filemap import Filemap
-from app.tool.finish import Finish
-from app.tool.list_files import ListFiles
-from app.tool.search_file import SearchFile
-from app.tool.str_replace_editor import StrReplaceEditor
-from app.tool.terminal import Terminal
-from app.tool.terminate import Terminate
-from app.tool.tool_collection import ToolCollection
-from app.tool.web_read import WebRead
+import importlib
+
+
+# Module of each exported tool. They are imported on first access, so importing one tool
+# (or BaseTool) does not load every other tool's dependencies, such as the browser stack.
+_EXPORTS = {
+    "AttemptCompletion": "app.tool.attempt_completion_client_request",
+    "BaseTool": "app.tool.base",
+    "Bash": "app.tool.bash",
+    "CodeReview": "app.tool.code_review",
+    "CreateChatCompletion": "app.tool.create_chat_completion",
+    "CreateTool": "app.tool.create_tool",
+    "FileNavigator": "app.tool.file_navigator",
+    "Filemap": "app.tool.filemap",
+    "Finish": "app.tool.finish",
+    "ListFiles": "app.tool.list_files",
+    "SearchFile": "app.tool.search_file",
+    "StrReplaceEditor": "app.tool.str_replace_editor",
+    "Terminal": "app.tool.terminal",
+    "Terminate": "app.tool.terminate",
+    "ToolCollection": "app.tool.tool_collection",
+    "WebRead": "app.tool.web_read",
+}
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
 
 
 __all__ = [
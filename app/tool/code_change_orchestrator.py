@@ -1,5 +1,5 @@
+import asyncio
 import os
-import subprocess
 import tempfile
 from pathlib import Path
 from typing import Dict, Any
@@ -271,45 +271,33 @@ class CodeChangeOrchestrator(BaseTool):
             temp_file_path = temp_file.name
             temp_file.write(patch_content)
 
-        original_dir = os.getcwd()
         try:
-            # Try to apply the patch
-            os.chdir(repo_path)
-
             # Check if patch can be applied
-            check_result = subprocess.run(
-                ["git", "apply", "--check", temp_file_path],
-                capture_output=True,
-                text=True
+            returncode, _, stderr = await self._run_git(
+                repo_path, "apply", "--check", temp_file_path
             )
 
-            if check_result.returncode != 0:
+            if returncode != 0:
                 # If check fails, try with --ignore-whitespace
-                check_result = subprocess.run(
-                    ["git", "apply", "--check", "--ignore-whitespace", temp_file_path],
-                    capture_output=True,
-                    text=True
+                returncode, _, stderr = await self._run_git(
+                    repo_path, "apply", "--check", "--ignore-whitespace", temp_file_path
                 )
 
-                if check_result.returncode != 0:
-                    return ToolResult(error=f"Patch cannot be applied: {check_result.stderr}")
+                if returncode != 0:
+                    return ToolResult(error=f"Patch cannot be applied: {stderr}")
                 else:
                     # Apply with --ignore-whitespace
-                    apply_result = subprocess.run(
-                        ["git", "apply", "--ignore-whitespace", temp_file_path],
-                        capture_output=True,
-                        text=True
+                    returncode, _, stderr = await self._run_git(
+                        repo_path, "apply", "--ignore-whitespace", temp_file_path
                     )
             else:
                 # Apply the patch normally
-                apply_result = subprocess.run(
-                    ["git", "apply", temp_file_path],
-                    capture_output=True,
-                    text=True
+                returncode, _, stderr = await self._run_git(
+                    repo_path, "apply", temp_file_path
                 )
 
-            if apply_result.returncode != 0:
-                return ToolResult(error=f"Failed to apply patch: {apply_result.stderr}")
+            if returncode != 0:
+                return ToolResult(error=f"Failed to apply patch: {stderr}")
 
             return ToolResult(output="Patch applied successfully")
 
@@ -317,10 +305,26 @@ class CodeChangeOrchestrator(BaseTool):
             return ToolResult(error=f"Error applying patch: {str(e)}")
 
         finally:
-            os.chdir(original_dir)
             # Clean up the temporary file
             os.unlink(temp_file_path)
 
+    @staticmethod
+    async def _run_git(repo_path: str, *args: str) -> tuple[int, str, str]:
+        """Run a git command in repo_path without blocking the event loop."""
+        proc = await asyncio.create_subprocess_exec(
+            "git",
+            *args,
+            cwd=repo_path,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        stdout, stderr = await proc.communicate()
+        return (
+            proc.returncode,
+            stdout.decode(errors="replace"),
+            stderr.decode(errors="replace"),
+        )
+
 
 if __name__ == "__main__":
     # Example usage
@@ -329,8 +333,6 @@ if __name__ == "__main__":
     request = "Add a new function to the calculator.py file to calculate the square of a number."
     repo_path = "/Users/manna/PycharmProjects/AgentHub/workspace/calculator"  # Change to your actual repository path
 
-    import asyncio
-
     # Example usage
     orchestrator = CodeChangeOrchestrator()
     result = asyncio.run(orchestrator.execute(request=request, repo_path=repo_path))
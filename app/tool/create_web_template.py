@@ -1,3 +1,4 @@
+import asyncio
 from enum import Enum
 from typing import Any
 import subprocess
@@ -46,8 +47,10 @@ class CreateWebTemplate(BaseTool):
         try:
             # Use create-vite with the minimal template
             create_command = f"yes | npm create vite@latest {project_name} -- --template react"
-            subprocess.run(create_command.format(project_name=project_name),
-                           shell=True, check=True, cwd=path)
+            # Run without blocking the event loop; other agents' tool calls keep going meanwhile
+            proc = await asyncio.create_subprocess_shell(create_command, cwd=path)
+            if await proc.wait() != 0:
+                raise subprocess.CalledProcessError(proc.returncode, create_command)
 
             project_path = os.path.join(path, project_name)
             project_path = os.path.abspath(project_path)
@@ -43,24 +43,22 @@ class ListFilesResult(ToolResult):
                     current[part] = {}
                 current = current[part]
 
-        # Format output
-        def format_tree(tree, indent="", is_last=True):
-            lines = []
-            items = list(tree.items())
-
-            for i, (name, subtree) in enumerate(items):
-                is_last_item = i == len(items) - 1
-                prefix = indent + ("    " if is_last else "    ")
-
+        # Format output: depth-first with an explicit stack of (remaining items, indent),
+        # appending every line to a single list
+        lines = []
+        stack = [(iter(tree.items()), "")]
+        while stack:
+            items, indent = stack[-1]
+            for name, subtree in items:
                 if subtree:  # It's a directory
                     lines.append(f"{indent}{name}/")
-                    lines.extend(format_tree(subtree, prefix, is_last_item))
-                else:  # It's a file
-                    lines.append(f"{indent}{name}")
-
-            return lines
+                    stack.append((iter(subtree.items()), indent + "    "))
+                    break
+                lines.append(f"{indent}{name}")  # It's a file
+            else:
+                stack.pop()
 
-        output = "\n".join(format_tree(tree))
+        output = "\n".join(lines)
 
         if self.limit_reached:
             output += f"\n\nNote: File limit reached. Some files may not be shown."
@@ -1,8 +1,9 @@
 import re
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, List, Any
 
-from pydantic import BaseModel, Field
+from pydantic import Field
 
 from app.llm import LLM
 from app.schema import Message
@@ -10,7 +11,48 @@ from app.tool import BaseTool
 from app.tool.base import ToolResult
 
 
-class CodeBlock(BaseModel):
+# Static prompt segments are kept at module level so each call only has to
+# splice in the request, file path and file content.
+_PROMPT_HEAD = """You are a specialized code analyzer to find 1 to {max_blocks} relevant code blocks in a file.
+Given the development request: 
+<github_request>
+"""
+_PROMPT_FILE_HEADER = "\n</github_request>\n\nHere is the content of the file "
+_PROMPT_TAIL = """Please identify 1 to {max_blocks} most relevant code blocks (functions, classes, or sections) that should be modified to fulfill the request.
+For each code block, provide the following information:
+
+<code_block_1>
+# Exact code block from the file
+</code_block_1>
+<start_line_1>line_number</start_line_1>
+<end_line_1>line_number</end_line_1>
+<explanation_1>Explain why this code block is relevant to the request</explanation_1>
+
+If there are additional relevant code blocks, continue with:
+
+<code_block_2>
+# Second code block
+</code_block_2>
+<start_line_2>line_number</start_line_2>
+<end_line_2>line_number</end_line_2>
+<explanation_2>Explanation for second block</explanation_2>
+
+<code_block_3>
+# Third code block
+</code_block_3>
+<start_line_3>line_number</start_line_3>
+<end_line_3>line_number</end_line_3>
+<explanation_3>Explanation for third block</explanation_3>
+
+Note: Only include blocks that are truly relevant. It's acceptable to return just 1 or 2 blocks if that's all that's needed.
+
+IMPORTANT: Make sure the line numbers are accurate. The first line of the file is line 1.
+Ensure that the code block you identify exactly matches the content between start_line and end_line.
+"""
+
+
+@dataclass(slots=True)
+class CodeBlock:
     """Represents a code block identified for modification."""
     code: str
     start_line: int
@@ -132,48 +174,18 @@ class LLMCodeBlockLocalizer(BaseTool):
         # Split file into lines for accurate line counting
         file_lines = file_content.splitlines()
 
-        prompt = f"""You are a specialized code analyzer to find 1 to {max_blocks} relevant code blocks in a file.
-Given the development request: 
-<github_request>
-{request}
-</github_request>
-
-Here is the content of the file {file_path}:
-<file_content>
-{file_content}
-</file_content>
-
-Please identify 1 to {max_blocks} most relevant code blocks (functions, classes, or sections) that should be modified to fulfill the request.
-For each code block, provide the following information:
-
-<code_block_1>
-# Exact code block from the file
-</code_block_1>
-<start_line_1>line_number</start_line_1>
-<end_line_1>line_number</end_line_1>
-<explanation_1>Explain why this code block is relevant to the request</explanation_1>
-
-If there are additional relevant code blocks, continue with:
-
-<code_block_2>
-# Second code block
-</code_block_2>
-<start_line_2>line_number</start_line_2>
-<end_line_2>line_number</end_line_2>
-<explanation_2>Explanation for second block</explanation_2>
-
-<code_block_3>
-# Third code block
-</code_block_3>
-<start_line_3>line_number</start_line_3>
-<end_line_3>line_number</end_line_3>
-<explanation_3>Explanation for third block</explanation_3>
-
-Note: Only include blocks that are truly relevant. It's acceptable to return just 1 or 2 blocks if that's all that's needed.
-
-IMPORTANT: Make sure the line numbers are accurate. The first line of the file is line 1.
-Ensure that the code block you identify exactly matches the content between start_line and end_line.
-"""
+        prompt = "".join(
+            (
+                _PROMPT_HEAD.format(max_blocks=max_blocks),
+                request,
+                _PROMPT_FILE_HEADER,
+                file_path,
+                ":\n<file_content>\n",
+                file_content,
+                "\n</file_content>\n\n",
+                _PROMPT_TAIL.format(max_blocks=max_blocks),
+            )
+        )
 
         response = await self.llm.ask([Message.user_message(prompt)])
 
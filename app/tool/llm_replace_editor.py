@@ -1,18 +1,83 @@
+import asyncio
+import difflib
+import heapq
+import os
 from pathlib import Path
 import re
-import os
-import tempfile
-import subprocess
 import shutil
+import uuid
 from typing import Dict, List, Any, Optional
 
 from pydantic import BaseModel, Field
 
+from app.cache import LLMCache, SemanticCache
 from app.llm import LLM
 from app.tool import BaseTool
 from app.tool.base import ToolResult
 
 
+# Static instructions lead each prompt so that every call shares a byte-identical
+# prefix, which lets the provider reuse its prompt cache; per-call content follows.
+_REPLACE_PROMPT_PREFIX = """You are a specialized code editor. You need to modify specific code blocks to fulfill a development request.
+
+For each original block given below, provide a replacement that implements the requested changes:
+
+<replacement_block_1>
+# Improved code that fulfills the request
+</replacement_block_1>
+<explanation_1>Explain what changes you made and why</explanation_1>
+
+Continue with additional blocks if there are multiple blocks to replace:
+
+<replacement_block_2>
+# Improved code for the second block
+</replacement_block_2>
+<explanation_2>Explanation for second replacement</explanation_2>
+
+<replacement_block_3>
+# Improved code for the third block
+</replacement_block_3>
+<explanation_3>Explanation for third replacement</explanation_3>
+
+IMPORTANT:
+1. Ensure the replacement code maintains the EXACT SAME INDENTATION as the original code block.
+2. Make sure the replacements maintain the overall functionality while addressing the request.
+3. The replacement must be complete blocks - do NOT use ellipses or "..." in your code.
+4. Only provide the <replacement_block_N> and <explanation_N> tags in your response.
+"""
+
+_CREATE_PROMPT_PREFIX = """You need to create a new file based on a development request.
+
+Please create appropriate content for this file that would fulfill the development request.
+Return only the file content, properly formatted and complete with all necessary imports, classes, and functions.
+"""
+
+# Colons inside the code are encoded as "&#58;", so only a ';' followed by a
+# "start:end:" header separates two segments; other ';' belong to the code
+_CODE_BLOCK_SEPARATOR_PATTERN = re.compile(r";(?=\d+:\d+:)")
+_CODE_BLOCK_SEGMENT_PATTERN = re.compile(r"^(\d+):(\d+):(.*)$", re.DOTALL)
+_REPLACEMENT_BLOCK_PATTERN = re.compile(r"<replacement_block_(\d+)>(.*?)</replacement_block_\1>", re.DOTALL)
+_EXPLANATION_PATTERN = re.compile(r"<explanation_(\d+)>(.*?)</explanation_\1>", re.DOTALL)
+_PYTHON_FENCE_START_PATTERN = re.compile(r'^```python\n')
+_FENCE_START_PATTERN = re.compile(r'^```\n')
+_FENCE_END_PATTERN = re.compile(r'\n```$')
+
+# Patches where more than this share of the new lines changed are emitted as a whole-file
+# replacement rather than a line diff
+_WHOLE_FILE_CHANGE_RATIO = 0.75
+# Above this size, only the lines between the unchanged head and tail are compared
+_WHOLE_FILE_PATCH_SIZE = 256 * 1024
+
+# Directories never searched for similar files
+_SIMILAR_FILE_SKIP_DIRS = frozenset({".git", "node_modules", "__pycache__", ".venv"})
+
+# Shared across tool instances so identical prompts reuse responses; only deterministic
+# (temperature 0) responses are stored, since a sampled one should not be replayed
+_response_cache = LLMCache()
+# Generated new-file contents keyed on the embedding of request + file extension
+_new_file_cache = SemanticCache()
+
+
 class CodeReplacement(BaseModel):
     """Represents a code replacement to be applied."""
     original: str
@@ -58,7 +123,7 @@ class LLMReplaceEditor(BaseTool):
             },
             "generate_patch": {
                 "type": "boolean",
-                "description": "Whether to generate a git diff patch for the changes"
+                "description": "Whether to generate a git diff patch for the changes (default: false)"
             },
             "apply_changes": {
                 "type": "boolean",
@@ -67,6 +132,14 @@ class LLMReplaceEditor(BaseTool):
             "is_new_file": {
                 "type": "boolean",
                 "description": "Whether this is a new file to be created"
+            },
+            "semantic_cache": {
+                "type": "boolean",
+                "description": "Whether to reuse content generated for a semantically similar new-file request"
+            },
+            "use_cache": {
+                "type": "boolean",
+                "description": "Whether to reuse the LLM response of an identical earlier request (default: true). Set to false when retrying an edit whose result was wrong"
             }
         },
         "required": ["request", "file_path"]
@@ -85,9 +158,12 @@ class LLMReplaceEditor(BaseTool):
         file_path = kwargs.get("file_path")
         repo_path = kwargs.get("repo_path", "")
         code_blocks = kwargs.get("code_blocks", [])
-        generate_patch = kwargs.get("generate_patch", True)
+        # Patches are only built on request; most callers just apply the changes
+        generate_patch = kwargs.get("generate_patch", False)
         apply_changes = kwargs.get("apply_changes", True)
         is_new_file = kwargs.get("is_new_file", False)
+        semantic_cache = kwargs.get("semantic_cache", False)
+        use_cache = kwargs.get("use_cache", True)
 
         if not request:
             return ToolResult(error="Development request is required")
@@ -97,25 +173,21 @@ class LLMReplaceEditor(BaseTool):
 
         # Convert code_blocks to expected format if needed
         if isinstance(code_blocks, str):
-            try:
-                # Try to parse from a system output format
-                parsed_blocks = []
-                for block_str in code_blocks.split(';'):
-                    parts = block_str.split(':', 2)
-                    if len(parts) >= 3:
-                        start_line, end_line, code = parts
-                        # Replace any encoded colons
-                        code = code.replace('&#58;', ':')
-                        parsed_blocks.append({
-                            "code": code,
-                            "start_line": int(start_line),
-                            "end_line": int(end_line),
-                            "explanation": ""
-                        })
-                code_blocks = parsed_blocks
-            except:
-                # If parsing fails, assume an empty list
-                code_blocks = []
+            # Parse from the "start:end:code;..." system output format, skipping malformed segments
+            parsed_blocks = []
+            for block_str in _CODE_BLOCK_SEPARATOR_PATTERN.split(code_blocks):
+                match = _CODE_BLOCK_SEGMENT_PATTERN.match(block_str)
+                if not match:
+                    continue
+                start_line, end_line, code = match.groups()
+                parsed_blocks.append({
+                    # Replace any encoded colons
+                    "code": code.replace('&#58;', ':'),
+                    "start_line": int(start_line),
+                    "end_line": int(end_line),
+                    "explanation": ""
+                })
+            code_blocks = parsed_blocks
 
         # Determine full file path
         if repo_path:
@@ -124,10 +196,12 @@ class LLMReplaceEditor(BaseTool):
             full_path = Path(file_path)
 
         original_content = ""
+        original_lines = []
         if full_path.exists() and not is_new_file:
             # Read existing file content
             try:
                 original_content = full_path.read_text()
+                original_lines = original_content.splitlines(keepends=True)
             except Exception as e:
                 return ToolResult(error=f"Error reading file: {str(e)}")
         else:
@@ -136,38 +210,51 @@ class LLMReplaceEditor(BaseTool):
 
         try:
             result_output = ""
+            new_lines = None
             if is_new_file:
                 # Generate content for a new file
-                new_content = await self._create_new_file_with_llm(request, file_path, repo_path)
+                new_content = await self._create_new_file_with_llm(
+                    request, file_path, repo_path, semantic_cache, use_cache
+                )
             else:
                 # Generate replacements for existing file
                 result = await self._replace_edit_file_with_llm(
-                    request, file_path, original_content, code_blocks
+                    request, file_path, original_content, code_blocks, original_lines, use_cache
                 )
 
                 if not result["success"]:
                     return ToolResult(error=f"Error generating replacements: {result.get('error', 'Unknown error')}")
 
                 new_content = result["content"]
+                new_lines = result["lines"]
                 replacements = result["replacements"]
 
                 # Format the output
-                result_output = f"Generated {len(replacements)} replacements for '{file_path}':\n"
+                output_parts = [f"Generated {len(replacements)} replacements for '{file_path}':\n"]
+                separator = "-" * 50 + "\n"
                 for i, rep in enumerate(replacements, 1):
-                    result_output += f"\nReplacement {i} (lines {rep['start_line']}-{rep['end_line']}):\n"
-                    result_output += "-" * 50 + "\n"
-                    result_output += "Original code:\n"
-                    result_output += rep["original"] + "\n\n"
-                    result_output += "Replacement code:\n"
-                    result_output += rep["replacement"] + "\n"
-                    result_output += "-" * 50 + "\n"
-                    result_output += f"Explanation: {rep['explanation']}\n"
+                    output_parts.extend((
+                        f"\nReplacement {i} (lines {rep['start_line']}-{rep['end_line']}):\n",
+                        separator,
+                        "Original code:\n",
+                        rep["original"] + "\n\n",
+                        "Replacement code:\n",
+                        rep["replacement"] + "\n",
+                        separator,
+                        f"Explanation: {rep['explanation']}\n",
+                    ))
+                result_output = "".join(output_parts)
+
+            # Nothing to patch or write when the edit is a no-op
+            if not is_new_file and new_content == original_content:
+                # Keep the LLM's replacements and explanations so the agent sees why
+                return ToolResult(output=f"{result_output}\nNo changes needed for '{file_path}'")
 
             # Generate patch if requested
             patch = ""
             if generate_patch:
-                patch = await self._generate_patch(
-                    file_path, original_content, new_content, Path(repo_path) if repo_path else None, is_new_file
+                patch = self._generate_patch(
+                    file_path, original_content, new_content, is_new_file, original_lines, new_lines
                 )
 
             # Apply changes if requested
@@ -194,7 +281,13 @@ class LLMReplaceEditor(BaseTool):
             return ToolResult(error=f"Error replacing code: {str(e)}")
 
     async def _replace_edit_file_with_llm(
-            self, request: str, file_path: str, file_content: str, code_blocks: List[Dict[str, Any]]
+            self,
+            request: str,
+            file_path: str,
+            file_content: str,
+            code_blocks: List[Dict[str, Any]],
+            content_lines: Optional[List[str]] = None,
+            use_cache: bool = True
     ) -> Dict[str, Any]:
         """
         Generate replacements for identified code blocks.
@@ -204,9 +297,11 @@ class LLMReplaceEditor(BaseTool):
             file_path: Path to the file
             file_content: Current content of the file
             code_blocks: List of code blocks to replace
+            content_lines: file_content split with line endings kept, if already computed
+            use_cache: Whether a cached response to the same prompt may be reused
 
         Returns:
-            Dictionary with success status, content, and replacements
+            Dictionary with success status, content, lines of the content, and replacements
         """
         if not code_blocks:
             return {
@@ -215,8 +310,7 @@ class LLMReplaceEditor(BaseTool):
                 "replacements": [],
             }
 
-        prompt = f"""You are a specialized code editor. You need to modify specific code blocks to fulfill a development request.
-
+        prompt_parts = [f"""{_REPLACE_PROMPT_PREFIX}
 Given the development request:
 <github_request>
 {request}
@@ -229,7 +323,7 @@ Here is the content of the file {file_path}:
 
 You need to replace the following code blocks with improved versions that fulfill the request:
 
-"""
+"""]
 
         # Add each code block to the prompt
         for i, block in enumerate(code_blocks, 1):
@@ -238,7 +332,7 @@ You need to replace the following code blocks with improved versions that fulfil
             end_line = block.get("end_line", 0)
             explanation = block.get("explanation", "")
 
-            prompt += f"""
+            prompt_parts.append(f"""
 <original_block_{i}>
 {code}
 </original_block_{i}>
@@ -246,64 +340,37 @@ You need to replace the following code blocks with improved versions that fulfil
 <end_line_{i}>{end_line}</end_line_{i}>
 <explanation_{i}>{explanation}</explanation_{i}>
 
-"""
+""")
 
-        prompt += """
-For each original block, provide a replacement that implements the requested changes:
-
-<replacement_block_1>
-# Improved code that fulfills the request
-</replacement_block_1>
-<explanation_1>Explain what changes you made and why</explanation_1>
-
-Continue with additional blocks if there are multiple blocks to replace:
-
-<replacement_block_2>
-# Improved code for the second block
-</replacement_block_2>
-<explanation_2>Explanation for second replacement</explanation_2>
-
-<replacement_block_3>
-# Improved code for the third block
-</replacement_block_3>
-<explanation_3>Explanation for third replacement</explanation_3>
-
-IMPORTANT:
-1. Ensure the replacement code maintains the EXACT SAME INDENTATION as the original code block.
-2. Make sure the replacements maintain the overall functionality while addressing the request.
-3. The replacement must be complete blocks - do NOT use ellipses or "..." in your code.
-4. Only provide the <replacement_block_N> and <explanation_N> tags in your response.
-"""
+        prompt = "".join(prompt_parts)
 
         # Generate replacements using LLM
         try:
-            response = await self.llm.ask(messages=[{"role": "user", "content": prompt}])
+            replacement_codes = {}
+            response = await self._stream_replacements(prompt, replacement_codes, use_cache)
 
             # Extract replacements
             replacements = []
 
             # Process file content as a list of lines for easier replacement
-            content_lines = file_content.splitlines()
+            if content_lines is None:
+                content_lines = file_content.splitlines(keepends=True)
 
-            # Sort code blocks by start line in descending order to avoid index issues during replacement
-            sorted_blocks = sorted(code_blocks, key=lambda x: x["start_line"], reverse=True)
+            # Keep each block's number from the prompt and walk the blocks in file order,
+            # so the new content can be assembled in a single forward pass
+            numbered_blocks = sorted(enumerate(code_blocks, 1), key=lambda x: x[1]["start_line"])
 
-            for i, block in enumerate(sorted_blocks):
-                block_num = sorted_blocks.index(block) + 1
-                replacement_match = re.search(
-                    f"<replacement_block_{block_num}>(.*?)</replacement_block_{block_num}>",
-                    response,
-                    re.DOTALL,
-                )
-                explanation_match = re.search(
-                    f"<explanation_{block_num}>(.*?)</explanation_{block_num}>", response, re.DOTALL
-                )
+            # Index the explanations by block number in a single scan
+            explanations = {}
+            for match in _EXPLANATION_PATTERN.finditer(response):
+                explanations.setdefault(int(match.group(1)), match.group(2).strip())
 
-                if replacement_match:
-                    new_code = replacement_match.group(1).strip()
-                    explanation = (
-                        explanation_match.group(1).strip() if explanation_match else ""
-                    )
+            new_lines = []
+            src_cursor = 0
+            for block_num, block in numbered_blocks:
+                new_code = replacement_codes.get(block_num)
+                if new_code is not None:
+                    explanation = explanations.get(block_num, "")
 
                     # Record the replacement
                     replacements.append(
@@ -316,27 +383,25 @@ IMPORTANT:
                         }
                     )
 
-                    # Calculate number of lines in original block and replacement
-                    orig_lines_count = len(block["code"].splitlines())
-                    new_lines_count = len(new_code.splitlines())
+                    # Copy the unchanged lines before the block, then the new code
+                    new_lines.extend(content_lines[src_cursor:block["start_line"] - 1])
+                    replacement_lines = new_code.splitlines(keepends=True)
+                    if replacement_lines and 0 < block["end_line"] <= len(content_lines):
+                        # End the new code the way the replaced block ended
+                        block_last_line = content_lines[block["end_line"] - 1]
+                        replacement_lines[-1] += block_last_line[len(block_last_line.rstrip("\r\n")):]
+                    new_lines.extend(replacement_lines)
+                    src_cursor = max(src_cursor, block["end_line"])
 
-                    # Replace the old code with the new code
-                    content_lines[block["start_line"] - 1: block["end_line"]] = new_code.splitlines()
-
-                    # Adjust subsequent block line numbers if the replacement changed the line count
-                    line_diff = new_lines_count - orig_lines_count
-                    if line_diff != 0:
-                        for j, other_block in enumerate(sorted_blocks):
-                            if j > i and other_block["start_line"] > block["start_line"]:
-                                sorted_blocks[j]["start_line"] += line_diff
-                                sorted_blocks[j]["end_line"] += line_diff
+            new_lines.extend(content_lines[src_cursor:])
 
             # Combine lines back into a single string
-            new_content = "\n".join(content_lines)
+            new_content = "".join(new_lines)
 
             return {
                 "success": True,
                 "content": new_content,
+                "lines": new_lines,
                 "replacements": replacements,
             }
 
@@ -347,7 +412,14 @@ IMPORTANT:
                 "replacements": [],
             }
 
-    async def _create_new_file_with_llm(self, request: str, file_path: str, repo_path: Optional[str] = None) -> str:
+    async def _create_new_file_with_llm(
+            self,
+            request: str,
+            file_path: str,
+            repo_path: Optional[str] = None,
+            semantic_cache: bool = False,
+            use_cache: bool = True
+    ) -> str:
         """
         Create a new file with content based on the development request.
 
@@ -355,50 +427,38 @@ IMPORTANT:
             request: The development request
             file_path: Path to create the file
             repo_path: Path to the repository (optional)
+            semantic_cache: Whether to reuse content generated for a similar request
+            use_cache: Whether a cached response to the same prompt may be reused
 
         Returns:
             The content created for the new file
         """
+        query_embedding = None
+        if semantic_cache and use_cache:
+            query_embedding = await self.llm.embed(f"{request.strip().lower()} {Path(file_path).suffix}")
+            cached = _new_file_cache.get(query_embedding)
+            if cached is not None:
+                return cached
+
         # Find similar files for context if repo_path is provided
         similar_file_contents = []
         if repo_path:
             repo = Path(repo_path)
 
-            # Get file extension to look for similar files
-            file_ext = Path(file_path).suffix
-            name_part = Path(file_path).stem
-
-            # Look for similar files
-            similar_files = []
-
-            # Method 1: Files with similar names
-            for f in repo.glob(f"**/*{name_part}*{file_ext}"):
-                similar_files.append(str(f.relative_to(repo)))
-
-            # Method 2: Files with the same extension in the same directory
-            file_dir = str(Path(file_path).parent)
-            if file_dir:
-                dir_path = repo / file_dir
-                if dir_path.exists():
-                    for f in dir_path.glob(f"*{file_ext}"):
-                        similar_files.append(str(f.relative_to(repo)))
-
-            # Limit to top 3 most relevant files
-            similar_files = sorted(list(set(similar_files)))[:3]
-
-            # Read similar files for context
-            for sf in similar_files:
-                try:
-                    content = (repo / sf).read_text()
+            # Discover candidates off the event loop, then read them concurrently
+            similar_files = await asyncio.to_thread(self._find_similar_files, repo, file_path)
+            contents = await asyncio.gather(
+                *(asyncio.to_thread((repo / sf).read_text) for sf in similar_files),
+                return_exceptions=True,
+            )
+            for sf, content in zip(similar_files, contents):
+                # Skip files that can't be read
+                if not isinstance(content, Exception):
                     similar_file_contents.append(f"File: {sf}\n\n{content}")
-                except Exception as e:
-                    # Skip files that can't be read
-                    pass
 
         similar_context = "\n\n---\n\n".join(similar_file_contents)
 
-        prompt = f"""You need to create a new file based on a development request.
-
+        prompt = f"""{_CREATE_PROMPT_PREFIX}
 Development Request:
 <github_request>
 {request}
@@ -409,22 +469,146 @@ File to create:
 
 {'Here are similar files for reference:' if similar_file_contents else ''}
 {'<similar_files>' + similar_context + '</similar_files>' if similar_file_contents else ''}
-
-Please create appropriate content for this file that would fulfill the development request.
-Return only the file content, properly formatted and complete with all necessary imports, classes, and functions.
 """
 
         # Generate file content using LLM
-        file_content = await self.llm.ask(messages=[{"role": "user", "content": prompt}])
+        file_content = await self._ask_cached(prompt, use_cache)
 
         # Clean up the content if the LLM wrapped it in code blocks
-        file_content = re.sub(r'^```python\n', '', file_content)
-        file_content = re.sub(r'\n```$', '', file_content)
-        file_content = re.sub(r'^```\n', '', file_content)
-        file_content = re.sub(r'\n```$', '', file_content)
+        file_content = _PYTHON_FENCE_START_PATTERN.sub('', file_content)
+        file_content = _FENCE_END_PATTERN.sub('', file_content)
+        file_content = _FENCE_START_PATTERN.sub('', file_content)
+        file_content = _FENCE_END_PATTERN.sub('', file_content)
+
+        if query_embedding is not None:
+            _new_file_cache.set(query_embedding, file_content)
 
         return file_content
 
+    async def _stream_replacements(
+            self, prompt: str, replacement_codes: Dict[int, str], use_cache: bool = True
+    ) -> str:
+        """
+        Stream the LLM response, indexing each replacement block by its number as soon
+        as its closing tag arrives.
+
+        Args:
+            prompt: The replacement prompt
+            replacement_codes: Dict filled with block number -> replacement code
+            use_cache: Whether a cached response to the same prompt may be reused
+
+        Returns:
+            The full LLM response
+        """
+        cache_key = self._response_cache_key(prompt)
+        response = _response_cache.get(cache_key) if cache_key and use_cache else None
+        if response is not None:
+            for match in _REPLACEMENT_BLOCK_PATTERN.finditer(response):
+                replacement_codes.setdefault(int(match.group(1)), match.group(2).strip())
+            return response
+
+        chunks = []
+        # Text received since the last completed block
+        pending = ""
+        async for chunk in self.llm.ask_stream(messages=[{"role": "user", "content": prompt}]):
+            chunks.append(chunk)
+            pending += chunk
+            if "</replacement_block_" not in pending:
+                continue
+            last_end = 0
+            for match in _REPLACEMENT_BLOCK_PATTERN.finditer(pending):
+                replacement_codes.setdefault(int(match.group(1)), match.group(2).strip())
+                last_end = match.end()
+            pending = pending[last_end:]
+
+        response = "".join(chunks).strip()
+        if not response:
+            raise ValueError("Empty response from streaming LLM")
+
+        if cache_key:
+            _response_cache.set(cache_key, response)
+        return response
+
+    @staticmethod
+    def _find_similar_files(repo: Path, file_path: str, limit: int = 3) -> List[str]:
+        """
+        Find up to `limit` files in the repository that resemble the file to create.
+
+        Args:
+            repo: Path to the repository
+            file_path: Path of the file to create (relative to repo)
+            limit: Maximum number of files to return
+
+        Returns:
+            Sorted list of similar file paths relative to repo
+        """
+        # Get file extension to look for similar files
+        file_ext = Path(file_path).suffix
+        name_part = Path(file_path).stem
+        root = str(repo)
+
+        similar_files = set()
+
+        # Method 1: Files with similar names, matched on the raw entry names of a
+        # depth-first scandir walk. The whole tree is walked: which files are kept
+        # must not depend on the order the filesystem lists them in
+        stack = [root]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in _SIMILAR_FILE_SKIP_DIRS:
+                                stack.append(entry.path)
+                        elif name_part in entry.name and entry.name.endswith(file_ext):
+                            similar_files.add(os.path.relpath(entry.path, root))
+            except OSError:
+                continue
+
+        # Method 2: Files with the same extension in the same directory
+        file_dir = str(Path(file_path).parent)
+        if file_dir:
+            try:
+                with os.scandir(repo / file_dir) as entries:
+                    for entry in entries:
+                        if entry.name.endswith(file_ext) and entry.is_file():
+                            similar_files.add(os.path.relpath(entry.path, root))
+            except OSError:
+                pass
+
+        # Limit to the most relevant files
+        return heapq.nsmallest(limit, similar_files)
+
+    def _response_cache_key(self, prompt: str) -> Optional[str]:
+        """Cache key of a prompt's response, or None when sampling makes it non-repeatable."""
+        if self.llm.temperature:
+            return None
+        return LLMCache.make_messages_key(
+            self.llm.model, [{"role": "user", "content": prompt}], self.llm.temperature
+        )
+
+    async def _ask_cached(self, prompt: str, use_cache: bool = True) -> str:
+        """
+        Ask the LLM, reusing the response of an identical earlier prompt.
+
+        Args:
+            prompt: The user prompt to send
+            use_cache: Whether a cached response may be reused; a fresh one replaces it
+
+        Returns:
+            The LLM response
+        """
+        cache_key = self._response_cache_key(prompt)
+        if cache_key and use_cache:
+            cached = _response_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        response = await self.llm.ask(messages=[{"role": "user", "content": prompt}])
+        if cache_key:
+            _response_cache.set(cache_key, response)
+        return response
+
     async def _apply_replacements_to_file(self, file_path: str, content: str) -> bool:
         """
         Write content to the specified file.
@@ -437,105 +621,149 @@ Return only the file content, properly formatted and complete with all necessary
             Boolean indicating success
         """
         try:
-            path = Path(file_path)
-            # Create directories if they don't exist
-            path.parent.mkdir(parents=True, exist_ok=True)
             # Normalize line endings for the OS
-            normalized_content = content.replace('\r\n', '\n')
-            path.write_text(normalized_content)
+            if '\r' in content:
+                content = content.replace('\r\n', '\n')
+            await asyncio.to_thread(self._write_file_atomic, Path(file_path), content.encode("utf-8"))
             return True
         except Exception as e:
             print(f"Error writing to file: {str(e)}")
             return False
 
-    async def _generate_patch(
+    @staticmethod
+    def _write_file_atomic(path: Path, data: bytes) -> None:
+        """
+        Write data to path through a synced temporary file and an atomic rename.
+        Unchanged content never gets here: execute returns early when the edit is a no-op.
+
+        Args:
+            path: Path to the file
+            data: Bytes to write
+        """
+        # Create directories if they don't exist
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # A unique temporary name, so concurrent writers to the same file cannot collide.
+        # Created 0666 so the kernel applies the current umask to new files
+        while True:
+            tmp_name = str(path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp"))
+            try:
+                fd = os.open(tmp_name, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+                break
+            except FileExistsError:
+                continue
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            if path.exists():
+                # Keep the permissions of the file being replaced
+                shutil.copymode(path, tmp_name)
+            os.replace(tmp_name, path)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+
+    def _generate_patch(
             self,
             file_path: str,
             original_content: str,
             new_content: str,
-            repo_path: Optional[Path] = None,
-            file_creation: bool = False
+            file_creation: bool = False,
+            original_lines: Optional[List[str]] = None,
+            new_lines: Optional[List[str]] = None
     ) -> str:
         """
-        Generate a git diff patch for changes.
+        Generate a git-style diff patch for changes.
 
         Args:
             file_path: Path to the file (relative to repo)
             original_content: Original content
             new_content: New content
-            repo_path: Path to repository (optional)
             file_creation: Whether this is a new file
+            original_lines: original_content split with line endings kept, if already computed
+            new_lines: new_content split with line endings kept, if already computed
 
         Returns:
             String containing the git diff patch
         """
-        if repo_path is None:
-            repo_path = Path.cwd()
-
-        original_dir = os.getcwd()
-        temp_dir = None
-
-        try:
-            # Create temporary directory and initialize git repo
-            temp_dir = Path(tempfile.mkdtemp())
-            os.chdir(temp_dir)
-            subprocess.run(["git", "init", "-q"], check=True)
-
-            # Create necessary directories for the file
-            rel_file_path = Path(file_path)
-            abs_file_path = temp_dir / rel_file_path
-            abs_file_path.parent.mkdir(parents=True, exist_ok=True)
-
-            # Configure git user
-            subprocess.run(["git", "config", "user.email", "patch@example.com"], check=True)
-            subprocess.run(["git", "config", "user.name", "Patch Generator"], check=True)
-
-            # Handle file creation vs modification
-            if file_creation:
-                # Create empty file first (for git to track its creation)
-                abs_file_path.touch()
-                subprocess.run(["git", "add", str(rel_file_path)], check=True)
-                subprocess.run(["git", "commit", "-m", "Initial commit"], check=True)
-
-                # Now create the actual file with new content
-                abs_file_path.write_text(new_content)
-                subprocess.run(["git", "add", str(rel_file_path)], check=True)
-            else:
-                # Write original content, commit, then update
-                abs_file_path.write_text(original_content)
-                subprocess.run(["git", "add", str(rel_file_path)], check=True)
-                subprocess.run(["git", "commit", "-m", "Original"], check=True)
-
-                # Write new content
-                abs_file_path.write_text(new_content)
-                subprocess.run(["git", "add", str(rel_file_path)], check=True)
-
-            # Generate diff
-            result = subprocess.run(
-                ["git", "diff", "--cached", "--no-color",
-                 f"--src-prefix=a/", f"--dst-prefix=b/"],
-                capture_output=True,
-                text=True,
-                check=True
+        rel_path = Path(file_path).as_posix()
+        header = [f"diff --git a/{rel_path} b/{rel_path}\n"]
+        if new_lines is None:
+            new_lines = new_content.splitlines(keepends=True)
+
+        if file_creation:
+            # The diff of a new file is the whole file added; no need to run a diff
+            header.append("new file mode 100644\n")
+            if not new_lines:
+                # Empty new file: git only emits the header
+                return "".join(header)
+            header.append(f"--- /dev/null\n+++ b/{rel_path}\n@@ -0,0 +1,{len(new_lines)} @@\n")
+            return "".join(header + self._prefix_patch_lines("+", new_lines))
+
+        if original_lines is None:
+            original_lines = original_content.splitlines(keepends=True)
+
+        if self._is_whole_file_rewrite(original_lines, new_lines, len(new_content)):
+            # Line-by-line diffing degrades badly when nearly everything changed,
+            # so emit a single hunk replacing the whole file instead
+            header.append(
+                f"--- a/{rel_path}\n+++ b/{rel_path}\n"
+                f"@@ -1,{len(original_lines)} +1,{len(new_lines)} @@\n"
+            )
+            return "".join(
+                header
+                + self._prefix_patch_lines("-", original_lines)
+                + self._prefix_patch_lines("+", new_lines)
             )
 
-            diff_content = result.stdout
-
-            if not diff_content.strip():
-                print("Warning: No changes detected in the diff")
-
-            return diff_content
-
-        except subprocess.CalledProcessError as e:
-            print(f"Git command failed: {e.stderr}")
+        diff_lines = difflib.unified_diff(
+            original_lines,
+            new_lines,
+            fromfile=f"a/{rel_path}",
+            tofile=f"b/{rel_path}",
+            n=3,
+        )
+
+        patch = []
+        for line in diff_lines:
+            if not line.endswith("\n"):
+                # Mirror git's marker for a missing trailing newline
+                line += "\n\\ No newline at end of file\n"
+            patch.append(line)
+
+        if not patch:
+            print("Warning: No changes detected in the diff")
             return ""
 
-        except Exception as e:
-            print(f"Error generating patch: {e}")
-            return ""
+        return "".join(header + patch)
 
-        finally:
-            # Clean up
-            os.chdir(original_dir)
-            if temp_dir:
-                shutil.rmtree(temp_dir)
+    @staticmethod
+    def _prefix_patch_lines(prefix: str, lines: List[str]) -> List[str]:
+        """Prefix every line for a patch hunk, marking a missing trailing newline like git."""
+        patch_lines = [prefix + line for line in lines]
+        if patch_lines and not patch_lines[-1].endswith("\n"):
+            patch_lines[-1] += "\n\\ No newline at end of file\n"
+        return patch_lines
+
+    @staticmethod
+    def _is_whole_file_rewrite(original_lines: List[str], new_lines: List[str], new_size: int) -> bool:
+        """Whether the change is large enough to patch as a whole-file replacement."""
+        if not original_lines or not new_lines:
+            return False
+        total = len(new_lines)
+        if new_size > _WHOLE_FILE_PATCH_SIZE:
+            # Skip the common head and tail first, so a small edit to a large file
+            # only hashes the few lines around it
+            limit = min(len(original_lines), total)
+            head = 0
+            while head < limit and original_lines[head] == new_lines[head]:
+                head += 1
+            tail = 0
+            while tail < limit - head and original_lines[-1 - tail] == new_lines[-1 - tail]:
+                tail += 1
+            original_lines = original_lines[head:len(original_lines) - tail]
+            new_lines = new_lines[head:total - tail]
+        original_set = set(original_lines)
+        changed = sum(1 for line in new_lines if line not in original_set)
+        return changed / total > _WHOLE_FILE_CHANGE_RATIO
@@ -12,11 +12,19 @@ except ImportError:
     from openhands_aci import file_editor
 
 import json
-import re
+from functools import lru_cache
+from typing import Optional
 
 from app.tool.base import BaseTool
 
 
+try:
+    # orjson parses large view outputs several times faster; the stdlib is the fallback
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+
 _STR_REPLACE_EDITOR_DESCRIPTION = """Custom editing tool for viewing, creating and editing files
 * State is persistent across command calls and discussions with the user
 * If `path` is a file, `view` displays the result of applying `cat -n`. If `path` is a directory, `view` lists non-hidden files and directories up to 2 levels deep
@@ -31,10 +39,39 @@ Notes for using the `str_replace` command:
 """
 
 
+_OH_ACI_OPEN = "<oh_aci_output_"
+_OH_ACI_CLOSE = "</oh_aci_output_"
+
+
+@lru_cache(maxsize=256)
+def _extract_oh_aci_json(tool_output: str) -> Optional[str]:
+    """Return the JSON text inside the oh_aci output block, or None if there is none."""
+    # Literal scans for the block's tags; output without the block has nothing to parse
+    start = tool_output.find(_OH_ACI_OPEN)
+    if start == -1:
+        return None
+    content_start = tool_output.find(">", start + len(_OH_ACI_OPEN)) + 1
+    if not content_start:
+        return None
+    end = tool_output.find(_OH_ACI_CLOSE, content_start)
+    return tool_output[content_start:end] if end != -1 else None
+
+
+@lru_cache(maxsize=256)
+def _formatted_oh_aci_output(json_text: str) -> str:
+    # json.loads ignores surrounding whitespace, so the block is not stripped first
+    return _json_loads(json_text)["formatted_output_and_error"]
+
+
 def parse_oh_aci_output(tool_output, return_string=True):
-    pattern = r"<oh_aci_output_.*?>(.*?)</oh_aci_output_"
-    json_data = json.loads(re.search(pattern, tool_output, re.DOTALL).group(1).strip())
-    return json_data["formatted_output_and_error"] if return_string else json_data
+    # Editors re-view the same files often, so repeated outputs are parsed from the caches;
+    # dicts are decoded fresh each time since callers may mutate them
+    json_text = _extract_oh_aci_json(tool_output)
+    if json_text is None:
+        return tool_output if return_string else {}
+    return (
+        _formatted_oh_aci_output(json_text) if return_string else _json_loads(json_text)
+    )
 
 
 class OHEditor(BaseTool):
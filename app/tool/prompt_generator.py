@@ -1,12 +1,108 @@
 import re
+from functools import lru_cache
 from typing import Union, List
 from pydantic import Field
 
+from app.cache import LLMCache
 from app.llm import LLM
 from app.prompt.prompt_generator import META_PROMPT
 from app.tool.base import BaseTool, ToolResult
 
 
+# The metaprompt examples before this section never change, so they are sent as their own
+# leading message and repeated calls share a byte-identical, provider-cacheable prefix
+_TASK_SECTION = "<Task>\n{{TASK}}"
+
+# Generation runs at temperature 0, so identical requests can reuse earlier responses
+_response_cache = LLMCache()
+
+_TAG_NAME_RE = re.compile(r'(/?)(\w+)>')
+_VAR_RE = re.compile(r'{([^}]+)}')
+
+
+def _remove_empty_tags_fast(text: str) -> str:
+    """
+    Remove empty XML-style tags ("\n<tag>  </tag>\n") in a single left-to-right scan.
+
+    Open tags that start a line are kept on a stack together with the output position
+    where they began; when the matching close tag is followed by a newline and nothing
+    but whitespace was kept in between, the output is truncated back to that position.
+    Tags that only wrapped removed empty tags are therefore removed as well.
+    """
+    out = []
+    # Each entry: [tag, index into out where "\n<tag>" starts, has non-whitespace content]
+    stack = []
+
+    def append_text(piece: str) -> None:
+        if piece:
+            out.append(piece)
+            if stack and not stack[-1][2] and not piece.isspace():
+                stack[-1][2] = True
+
+    pos = 0
+    while True:
+        lt = text.find('<', pos)
+        if lt == -1:
+            append_text(text[pos:])
+            break
+
+        match = _TAG_NAME_RE.match(text, lt + 1)
+        if not match:
+            append_text(text[pos:lt + 1])
+            pos = lt + 1
+            continue
+
+        is_close, tag = match.group(1), match.group(2)
+        tag_end = match.end()
+
+        if not is_close:
+            if lt > pos and text[lt - 1] == '\n':
+                # Candidate empty tag: the leading newline belongs to it
+                append_text(text[pos:lt - 1])
+                stack.append([tag, len(out), False])
+                out.append(text[lt - 1:tag_end])
+            else:
+                append_text(text[pos:tag_end])
+            pos = tag_end
+            continue
+
+        append_text(text[pos:lt])
+        depth = next((i for i in range(len(stack) - 1, -1, -1) if stack[i][0] == tag), None)
+        if depth is None:
+            append_text(text[lt:tag_end])
+            pos = tag_end
+            continue
+
+        # Unclosed tags above the match stay in the output, so the match has content
+        if depth < len(stack) - 1:
+            del stack[depth + 1:]
+            stack[-1][2] = True
+
+        entry = stack.pop()
+        if not entry[2] and text.startswith('\n', tag_end):
+            del out[entry[1]:]
+            pos = tag_end + 1
+        else:
+            out.append(text[lt:tag_end])
+            if stack:
+                stack[-1][2] = True
+            pos = tag_end
+
+    return ''.join(out)
+
+
+@lru_cache(maxsize=128)
+def _format_variables(variables: tuple) -> str:
+    """Format (once per distinct variable set) variable names as ${NAME} lines."""
+    return "\n".join(f"${{{var}}}" for var in variables)
+
+
+@lru_cache(maxsize=32)
+def _tag_re(tag: str) -> re.Pattern:
+    """Compile (once per tag) the pattern matching content between XML-style tags."""
+    return re.compile(f"<{tag}>(.+?)</{tag}>", re.DOTALL)
+
+
 class PromptGeneratorTool(BaseTool):
     """Tool for automatically generating AI prompt templates with example support."""
 
@@ -41,21 +137,20 @@ class PromptGeneratorTool(BaseTool):
     @classmethod
     def validate_variables(cls, v):
         """Convert various variable input formats to a list."""
+        if v is None:
+            return []
         if isinstance(v, str):
-            if v.strip() == "":
-                return []
             # Handle newline-separated variable string
             return [var.strip().strip('${}') for var in v.split('\n') if var.strip()]
-        elif isinstance(v, (list, tuple)):
+        try:
             return list(v)
-        raise ValueError("Variables must be a string or list of strings")
+        except TypeError:
+            raise ValueError("Variables must be a string or list of strings")
 
     @staticmethod
     def format_variables(variables: List[str]) -> str:
         """Format variables list into the required string format."""
-        if not variables:
-            return ""
-        return "\n".join([f"${{{var}}}" for var in variables])
+        return _format_variables(tuple(variables)) if variables else ""
 
     async def execute(
             self,
@@ -77,8 +172,9 @@ class PromptGeneratorTool(BaseTool):
             validated_vars = self.validate_variables(variables)
             variable_string = self.format_variables(validated_vars)
 
-            # Replace task placeholder in metaprompt
-            prompt = self.metaprompt.replace("{{TASK}}", task)
+            # Split the metaprompt into its static prefix and the task-specific remainder
+            static_prefix, task_section, remainder = self.metaprompt.partition(_TASK_SECTION)
+            task_prompt = (task_section + remainder).replace("{{TASK}}", task)
 
             # Construct assistant partial response
             assistant_partial = "<Inputs>"
@@ -86,19 +182,30 @@ class PromptGeneratorTool(BaseTool):
                 assistant_partial += f"{variable_string}\n</Inputs>\n<Instructions Structure>"
 
             # Create message for the model
-            response = await self.llm.ask(
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt
-                    },
-                    {
-                        "role": "assistant",
-                        "content": assistant_partial
-                    }
-                ],
-                temperature=0
-            )
+            messages = [
+                {
+                    "role": "user",
+                    "content": static_prefix
+                },
+                {
+                    "role": "user",
+                    "content": task_prompt
+                },
+                {
+                    "role": "assistant",
+                    "content": assistant_partial
+                }
+            ]
+            if not task_prompt:
+                # No task section in a custom metaprompt: send it whole
+                messages[0]["content"] = static_prefix.replace("{{TASK}}", task)
+                del messages[1]
+
+            cache_key = LLMCache.make_messages_key(self.llm.model, messages, 0)
+            response = _response_cache.get(cache_key)
+            if response is None:
+                response = await self.llm.ask(messages=messages, temperature=0)
+                _response_cache.set(cache_key, response)
 
             # Extract and process the generated prompt
             generated_prompt = self._extract_prompt(response)
@@ -127,7 +234,7 @@ class PromptGeneratorTool(BaseTool):
     @staticmethod
     def _extract_between_tags(tag: str, string: str, strip: bool = False) -> list[str]:
         """Extract content between specified XML-style tags."""
-        ext_list = re.findall(f"<{tag}>(.+?)</{tag}>", string, re.DOTALL)
+        ext_list = _tag_re(tag).findall(string)
         if strip:
             return [e.strip() for e in ext_list]
         return ext_list
@@ -135,35 +242,30 @@ class PromptGeneratorTool(BaseTool):
     @staticmethod
     def _remove_empty_tags(text: str) -> str:
         """Remove empty XML-style tags from text."""
-        return re.sub(r'\n<(\w+)>\s*</\1>\n', '', text, flags=re.DOTALL)
+        return _remove_empty_tags_fast(text)
 
     @staticmethod
     def _strip_last_sentence(text: str) -> str:
         """Remove the last sentence if it starts with 'Let me know'."""
-        sentences = text.split('. ')
-        if sentences[-1].startswith("Let me know"):
-            sentences = sentences[:-1]
-            result = '. '.join(sentences)
-            if result and not result.endswith('.'):
-                result += '.'
-            return result
-        return text
+        idx = text.rfind('. ')
+        if not text.startswith("Let me know", idx + 2 if idx != -1 else 0):
+            return text
+        result = text[:idx] if idx != -1 else ''
+        if result and not result.endswith('.'):
+            result += '.'
+        return result
 
     def _extract_prompt(self, metaprompt_response: str) -> str:
         """Extract and process the prompt template from the metaprompt response."""
         between_tags = self._extract_between_tags("Instructions", metaprompt_response)[0]
-        processed = between_tags[:1000] + self._strip_last_sentence(
-            self._remove_empty_tags(
-                self._remove_empty_tags(between_tags[1000:]).strip()
-            ).strip()
-        )
-        return processed
+        head, tail = between_tags[:1000], between_tags[1000:]
+        tail = self._strip_last_sentence(_remove_empty_tags_fast(tail).strip())
+        return head + tail if tail else head
 
     @staticmethod
     def _extract_variables(prompt: str) -> set:
         """Extract variable names from the prompt template."""
-        pattern = r'{([^}]+)}'
-        return set(re.findall(pattern, prompt))
+        return set(_VAR_RE.findall(prompt))
 
 
 async def main():
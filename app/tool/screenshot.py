@@ -1,13 +1,120 @@
-from typing import Optional
+from collections import OrderedDict
+from typing import Optional, Tuple, Union
 
 from app.config import config
 from app.tool import BaseTool
 from app.tool.base import ToolResult
+from app.utils.shutdown_listener import add_cleanup_handler
 
+import asyncio
 import base64
+import io
+import mmap
 import os
+import time
+import weakref
 import httpx
-from urllib.parse import urlparse
+from PIL import Image
+
+
+# Downloads larger than this are aborted instead of being buffered in full
+MAX_SCREENSHOT_BYTES = 32 * 1024 * 1024
+
+# Supported local image extensions and their MIME types
+_MIME_TYPES = {
+    '.png': 'image/png',
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.gif': 'image/gif',
+    '.webp': 'image/webp'
+}
+_VALID_EXTS = frozenset(_MIME_TYPES)
+
+# When max_dim is set, images whose longer side exceeds it are shrunk before being sent to the
+# vision model, which tokenizes per tile: smaller images cost fewer tokens and less bandwidth.
+# Images are kept at full size by default (0)
+DEFAULT_MAX_DIM = 0
+_JPEG_QUALITY = 85
+
+# Encodings images can be captured or re-encoded in: PNG by default, JPEG when asked for
+_IMAGE_FORMATS = {
+    "png": ("PNG", "image/png"),
+    "jpeg": ("JPEG", "image/jpeg")
+}
+
+# Recent URL captures keyed by (url, device, image_format), each stored with its capture time
+_SCREENSHOT_CACHE: "OrderedDict[Tuple[str, str, str], Tuple[float, bytes]]" = OrderedDict()
+_SCREENSHOT_CACHE_SIZE = 32
+DEFAULT_CACHE_TTL = 600
+
+# screenshotone.com parameters that do not depend on the request
+_STATIC_PARAMS = {
+    "full_page": "true",
+    "device_scale_factor": "1",
+    "block_ads": "true",
+    "block_cookie_banners": "true",
+    "block_trackers": "true",
+    "cache": "false"
+}
+_VIEWPORTS = {
+    "mobile": {"viewport_width": "342", "viewport_height": "684"},
+    "desktop": {"viewport_width": "1280", "viewport_height": "832"}
+}
+# Pooled HTTP clients, one per event loop since their connections are bound to the loop that opened them
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+_cleanup_registered = False
+
+
+def _get_client() -> httpx.AsyncClient:
+    """Return the running loop's pooled client, creating it on first use so connections are reused across captures."""
+    global _cleanup_registered
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = _clients[loop] = httpx.AsyncClient(
+            timeout=60,
+            limits=httpx.Limits(max_keepalive_connections=4),
+        )
+        if not _cleanup_registered:
+            add_cleanup_handler(_close_client)
+            _cleanup_registered = True
+    return client
+
+
+async def _close_client():
+    """Close the running loop's pooled client; those of other loops go away with their loops."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+_FORMAT_PARAMS = {
+    "png": {"format": "png"},
+    "jpeg": {"format": "jpg", "image_quality": str(_JPEG_QUALITY)}
+}
+
+
+def is_url(source: str) -> bool:
+    """Whether the screenshot source is a web URL rather than a local path."""
+    return source.startswith(("http://", "https://"))
+
+
+def _downscale_image(image: Union[bytes, mmap.mmap], max_dim: int, image_format: str) -> Optional[bytes]:
+    """Fit the image into max_dim x max_dim and re-encode it in image_format; None if it already fits."""
+    with Image.open(io.BytesIO(image) if isinstance(image, bytes) else image) as img:
+        if max(img.size) <= max_dim:
+            return None
+        img.thumbnail((max_dim, max_dim), Image.Resampling.LANCZOS)
+        output = io.BytesIO()
+        if image_format == "jpeg":
+            img.convert("RGB").save(output, format="JPEG", quality=_JPEG_QUALITY)
+        else:
+            if img.mode not in ("1", "L", "LA", "P", "RGB", "RGBA"):
+                img = img.convert("RGBA")
+            img.save(output, format="PNG")
+        return output.getvalue()
 
 
 class ScreenshotTool(BaseTool):
@@ -28,8 +135,23 @@ class ScreenshotTool(BaseTool):
             },
             "mime_type": {
                 "type": "string",
-                "default": "image/png",
-                "description": "MIME type for local images"
+                "description": "MIME type for local images (default: derived from the file extension)"
+            },
+            "max_dim": {
+                "type": "integer",
+                "default": DEFAULT_MAX_DIM,
+                "description": "Downscale images whose longer side exceeds this many pixels (0 keeps the original)"
+            },
+            "image_format": {
+                "type": "string",
+                "enum": list(_IMAGE_FORMATS),
+                "default": "png",
+                "description": "Encoding for URL screenshots and downscaled images; jpeg is smaller but lossy"
+            },
+            "local_cache_ttl": {
+                "type": "integer",
+                "default": DEFAULT_CACHE_TTL,
+                "description": "Seconds a URL screenshot is reused for the same device (0 always captures anew)"
             }
         },
         "required": ["source"]
@@ -41,54 +163,91 @@ class ScreenshotTool(BaseTool):
             self,
             source: str,
             device: str = "desktop",
-            mime_type: str = "image/png"
+            mime_type: Optional[str] = None,
+            max_dim: int = DEFAULT_MAX_DIM,
+            local_cache_ttl: int = DEFAULT_CACHE_TTL,
+            image_format: str = "png"
     ) -> ToolResult:
+        if image_format not in _IMAGE_FORMATS:
+            return ToolResult(
+                error=f"Unsupported image format '{image_format}'. Choose from: {', '.join(_IMAGE_FORMATS)}"
+            )
         try:
             # Determine if source is URL or file path
-            is_url = bool(urlparse(source).scheme)
-
-            if is_url:
+            if is_url(source):
                 if not self.screenshot_api_key:
                     return ToolResult(
                         error="API key is required for URL screenshots. Please provide 'screenshot_api_key' parameter."
                     )
-                return await self._handle_url(source, device)
+                return await self._handle_url(source, device, max_dim, local_cache_ttl, image_format)
             else:
-                return await self._handle_local_file(source, mime_type)
+                return await self._handle_local_file(source, mime_type, max_dim, image_format)
 
         except Exception as e:
             return ToolResult(error=f"Screenshot operation failed: {str(e)}")
 
-    async def _handle_local_file(self, image_path: str, mime_type: str) -> ToolResult:
+    async def _handle_local_file(
+            self,
+            image_path: str,
+            mime_type: Optional[str] = None,
+            max_dim: int = DEFAULT_MAX_DIM,
+            image_format: str = "png"
+    ) -> ToolResult:
         """Handle local image file loading"""
         # Validate file exists
         if not os.path.exists(image_path):
             return ToolResult(error=f"Image file not found: {image_path}")
 
         # Validate file is an image
-        valid_extensions = ['.png', '.jpg', '.jpeg', '.gif', '.webp']
-        if not any(image_path.lower().endswith(ext) for ext in valid_extensions):
+        ext = os.path.splitext(image_path)[1].lower()
+        if ext not in _VALID_EXTS:
             return ToolResult(
-                error=f"Invalid image file type. Supported types: {', '.join(valid_extensions)}"
+                error=f"Invalid image file type. Supported types: {', '.join(_MIME_TYPES)}"
             )
+        mime_type = mime_type or _MIME_TYPES[ext]
 
-        # Read image file
-        with open(image_path, 'rb') as f:
-            image_bytes = f.read()
+        if os.path.getsize(image_path) == 0:
+            return ToolResult(error=f"Image file is empty: {image_path}")
 
-        # Convert to base64 data URL
-        base64_image = self._bytes_to_data_url(image_bytes, mime_type)
+        # Map the file and encode straight from the mapping, without copying it into a bytes object
+        with open(image_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as image_buffer:
+            # GIFs may be animated, so they are passed through as-is
+            resized = None
+            if max_dim and ext != '.gif':
+                resized = await asyncio.to_thread(_downscale_image, image_buffer, max_dim, image_format)
+            if resized is None:
+                base64_image = self._bytes_to_data_url(image_buffer, mime_type)
+            else:
+                base64_image = self._bytes_to_data_url(resized, _IMAGE_FORMATS[image_format][1])
 
         return ToolResult(
             output=f"Successfully loaded image from {image_path}",
             system=base64_image
         )
 
-    async def _handle_url(self, url: str, device: str) -> ToolResult:
+    async def _handle_url(
+            self,
+            url: str,
+            device: str,
+            max_dim: int = DEFAULT_MAX_DIM,
+            local_cache_ttl: int = DEFAULT_CACHE_TTL,
+            image_format: str = "png"
+    ) -> ToolResult:
         """Handle URL screenshot capture"""
         try:
-            image_bytes = await self._capture_screenshot(url, self.screenshot_base_url,self.screenshot_api_key, device)
-            base64_image = self._bytes_to_data_url(image_bytes, "image/png")
+            cache_key = (url, device, image_format)
+            image_bytes = self._get_cached_screenshot(cache_key, local_cache_ttl)
+            if image_bytes is None:
+                image_bytes = await self._capture_screenshot(
+                    url, self.screenshot_base_url, self.screenshot_api_key, device, image_format
+                )
+                if local_cache_ttl > 0:
+                    self._cache_screenshot(cache_key, image_bytes)
+            if max_dim:
+                image_bytes = (
+                    await asyncio.to_thread(_downscale_image, image_bytes, max_dim, image_format) or image_bytes
+                )
+            base64_image = self._bytes_to_data_url(image_bytes, _IMAGE_FORMATS[image_format][1])
 
             return ToolResult(
                 output=f"Successfully captured screenshot from {url}",
@@ -98,46 +257,64 @@ class ScreenshotTool(BaseTool):
             return ToolResult(error=f"Failed to capture screenshot: {str(e)}")
 
     @staticmethod
-    async def _capture_screenshot(target_url: str, base_url, screenshot_api_key: str, device: str) -> bytes:
+    def _get_cached_screenshot(key: Tuple[str, str, str], ttl: int) -> Optional[bytes]:
+        """Return the (url, device, image_format) capture taken within the last ttl seconds, if any."""
+        if ttl <= 0:
+            return None
+        entry = _SCREENSHOT_CACHE.get(key)
+        if entry is None:
+            return None
+        captured_at, image_bytes = entry
+        if time.monotonic() - captured_at > ttl:
+            del _SCREENSHOT_CACHE[key]
+            return None
+        _SCREENSHOT_CACHE.move_to_end(key)
+        return image_bytes
+
+    @staticmethod
+    def _cache_screenshot(key: Tuple[str, str, str], image_bytes: bytes) -> None:
+        """Store a capture, evicting the least recently used one when full."""
+        _SCREENSHOT_CACHE[key] = (time.monotonic(), image_bytes)
+        _SCREENSHOT_CACHE.move_to_end(key)
+        if len(_SCREENSHOT_CACHE) > _SCREENSHOT_CACHE_SIZE:
+            _SCREENSHOT_CACHE.popitem(last=False)
+
+    async def _capture_screenshot(
+            self, target_url: str, base_url, screenshot_api_key: str, device: str, image_format: str = "png"
+    ) -> bytes:
         """Capture screenshot using screenshotone.com API"""
         params = {
+            **_STATIC_PARAMS,
+            **_FORMAT_PARAMS[image_format],
             "access_key": screenshot_api_key,
             "url": target_url,
-            "full_page": "true",
-            "device_scale_factor": "1",
-            "format": "png",
-            "block_ads": "true",
-            "block_cookie_banners": "true",
-            "block_trackers": "true",
-            "cache": "false",
-            "viewport_width": "342" if device == "mobile" else "1280",
-            "viewport_height": "684" if device == "mobile" else "832"
+            **_VIEWPORTS.get(device, _VIEWPORTS["desktop"])
         }
 
-        async with httpx.AsyncClient(timeout=60) as client:
-            response = await client.get(base_url, params=params)
-            if response.status_code == 200 and response.content:
-                return response.content
-            else:
+        client = _get_client()
+        async with client.stream("GET", base_url, params=params) as response:
+            if response.status_code != 200:
                 raise Exception(f"API returned status code: {response.status_code}")
 
+            image = bytearray()
+            async for chunk in response.aiter_bytes(65536):
+                image.extend(chunk)
+                if len(image) > MAX_SCREENSHOT_BYTES:
+                    raise Exception(f"Screenshot exceeds {MAX_SCREENSHOT_BYTES} bytes")
+
+            if not image:
+                raise Exception("API returned an empty screenshot")
+            return bytes(image)
+
+    async def cleanup(self):
+        """Close the pooled HTTP client of the running loop."""
+        await _close_client()
+
     @staticmethod
-    def _bytes_to_data_url(image_bytes: bytes, mime_type: str) -> str:
+    def _bytes_to_data_url(image_bytes: Union[bytes, mmap.mmap], mime_type: str) -> str:
         """Convert image bytes to base64 data URL"""
-        base64_image = base64.b64encode(image_bytes).decode("utf-8")
-        return f"data:{mime_type};base64,{base64_image}"
-
-    def _get_mime_type(self, file_path: str) -> str:
-        """Determine MIME type from file extension"""
-        extension = os.path.splitext(file_path)[1].lower()
-        mime_types = {
-            '.png': 'image/png',
-            '.jpg': 'image/jpeg',
-            '.jpeg': 'image/jpeg',
-            '.gif': 'image/gif',
-            '.webp': 'image/webp'
-        }
-        return mime_types.get(extension, 'image/png')
+        # base64 output is pure ASCII: assemble the URL as bytes and decode once
+        return (f"data:{mime_type};base64,".encode("ascii") + base64.b64encode(image_bytes)).decode("ascii")
 
 
 async def main():
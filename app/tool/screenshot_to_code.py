@@ -1,13 +1,23 @@
 from typing import Optional
-from urllib.parse import urlparse
 
+from pydantic import Field
+
+from app.cache import LLMCache
 from app.llm import LLM
 from app.prompt.screenshot_to_code import SYSTEM_PROMPTS, USER_PROMPTS
 from app.tool import BaseTool
 from app.tool.base import ToolResult
 from app.tool.oh_editor import OHEditor
 from app.utils.extract_html_content import extract_code_content
-from app.tool.screenshot import ScreenshotTool
+from app.tool.screenshot import ScreenshotTool, is_url
+
+
+# Keyed on the full messages and temperature; only deterministic (temperature 0) generations
+# are cached, so identical screenshots with the same stack reuse the code
+_response_cache = LLMCache()
+
+# Generated code longer than this is truncated in the tool output
+_PREVIEW_LIMIT = 4096
 
 
 class ScreenshotToCodeTool(BaseTool):
@@ -35,15 +45,31 @@ class ScreenshotToCodeTool(BaseTool):
                 "enum": ["react-tailwind", "html-tailwind", "svg"],
                 "default": "react-tailwind",
                 "description": "Target technology stack for frontend code generation"
+            },
+            "verbose": {
+                "type": "boolean",
+                "default": False,
+                "description": "Show the saved file through the editor view instead of a plain preview"
+            },
+            "use_cache": {
+                "type": "boolean",
+                "default": True,
+                "description": "Whether to reuse the code generated for an identical earlier request. Set to false when retrying a generation whose result was wrong"
             }
         },
         "required": ["source", "target_path"]
     }
 
-    llm: LLM = LLM("vision")
+    llm: LLM = Field(default_factory=lambda: LLM("vision"))
     screenshot_tool: ScreenshotTool = ScreenshotTool()
     editor: OHEditor = OHEditor()
 
+    def _response_cache_key(self, prompt_messages: list) -> Optional[str]:
+        """Cache key of the generated code, or None when sampling makes it non-repeatable."""
+        if self.llm.temperature:
+            return None
+        return LLMCache.make_messages_key(self.llm.model, prompt_messages, self.llm.temperature)
+
     @staticmethod
     def create_prompt_messages(
             image_data: str,
@@ -89,14 +115,19 @@ class ScreenshotToCodeTool(BaseTool):
             source: str,
             target_path: str,
             device: str = "desktop",
-            stack: str = "react-tailwind"
+            stack: str = "react-tailwind",
+            verbose: bool = False,
+            use_cache: bool = True
     ) -> ToolResult:
+        # Reject an unknown stack before paying for a capture
+        if stack not in SYSTEM_PROMPTS:
+            return ToolResult(
+                error=f"Unsupported stack '{stack}'. Choose from: {', '.join(SYSTEM_PROMPTS)}"
+            )
+
         try:
             # Get screenshot or load image
-            screenshot_result = await self.screenshot_tool.execute(
-                source=source,
-                device=device
-            )
+            screenshot_result = await self.screenshot_tool.execute(source=source, device=device)
 
             if screenshot_result.error:
                 return ToolResult(error=f"Failed to get image: {screenshot_result.error}")
@@ -108,7 +139,12 @@ class ScreenshotToCodeTool(BaseTool):
             )
 
             # Generate code using LLM
-            response = await self.llm.ask(prompt_messages)
+            cache_key = self._response_cache_key(prompt_messages)
+            response = _response_cache.get(cache_key) if cache_key and use_cache else None
+            if response is None:
+                response = await self.llm.ask(prompt_messages)
+                if cache_key:
+                    _response_cache.set(cache_key, response)
 
             # Extract code content
             code_content = extract_code_content(response, stack)
@@ -120,14 +156,16 @@ class ScreenshotToCodeTool(BaseTool):
                 file_text=code_content
             )
 
-            # View the generated code
-            view_result = await self.editor.execute(
-                command="view",
-                path=target_path
-            )
+            # The code is already in memory; only go back through the editor when asked to
+            if verbose:
+                preview = str(await self.editor.execute(command="view", path=target_path))
+            elif len(code_content) > _PREVIEW_LIMIT:
+                preview = code_content[:_PREVIEW_LIMIT] + "\n...[truncated]"
+            else:
+                preview = code_content
 
             return ToolResult(
-                output=f"Successfully generated code from {'URL' if urlparse(source).scheme else 'local image'} to {target_path}.\n{str(view_result)}",
+                output=f"Successfully generated code from {'URL' if is_url(source) else 'local image'} to {target_path}.\n{preview}",
             )
 
         except Exception as e:
@@ -1,8 +1,248 @@
+import asyncio
+import codecs
+import fnmatch
+import io
+import mmap
+import multiprocessing
+import os
+import re
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from pathlib import Path
-from typing import List, Optional
+from functools import lru_cache, wraps
+from itertools import chain, islice
+from pathlib import PurePath
+from typing import Any, BinaryIO, Callable, Iterator, List, Optional
 
 from app.tool.base import BaseTool
+from app.utils.shutdown_listener import add_cleanup_handler
+
+
+# The prefilters below walk the regex parse tree of CPython's private re._parser module,
+# which may change in any release; when it is missing or a walk fails, files are scanned
+# with the plain pattern instead
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:
+    try:
+        import sre_parse
+    except ImportError:
+        sre_parse = None
+
+# Files are checked for the pattern's required literal in chunks of this size
+_PREFILTER_CHUNK_SIZE = 1024 * 1024
+# Files with a NUL byte in their first _BINARY_PEEK_SIZE bytes are treated as binary
+_BINARY_PEEK_SIZE = 4096
+# Files larger than this are memory-mapped for the literal check instead of read in chunks
+_MMAP_THRESHOLD = 64 * 1024
+
+# Only this many results are shown, so scanning stops once they are found
+MAX_RESULTS = 250
+
+# Searches over at least this many files are spread across worker processes,
+# each handed batches of _BATCH_SIZE files
+_PARALLEL_MIN_FILES = 64
+_BATCH_SIZE = 32
+# The pool is shared by every SearchFile, so it is kept small
+_MAX_WORKERS = min(4, os.cpu_count() or 1)
+# Batches submitted to the pool ahead of the one being collected
+_MAX_IN_FLIGHT = 2 * _MAX_WORKERS
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    """Create the worker pool shared by all SearchFile tools on first use."""
+    global _process_pool
+    if _process_pool is None:
+        # Forking a process that runs an event loop and helper threads is unsafe,
+        # so workers are started from a clean server process instead
+        method = (
+            "forkserver"
+            if "forkserver" in multiprocessing.get_all_start_methods()
+            else "spawn"
+        )
+        _process_pool = ProcessPoolExecutor(
+            max_workers=_MAX_WORKERS, mp_context=multiprocessing.get_context(method)
+        )
+        add_cleanup_handler(_shutdown_process_pool)
+    return _process_pool
+
+
+def _shutdown_process_pool():
+    """Stop the worker pool, dropping any batches not yet started."""
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=True, cancel_futures=True)
+        _process_pool = None
+
+
+@lru_cache(maxsize=128)
+def _compile_pattern(regex_pattern: str) -> re.Pattern:
+    """Compile a search pattern once per process."""
+    return re.compile(regex_pattern)
+
+
+def _fallback_on_error(default):
+    """Return default when a parse-tree walk fails instead of failing the search."""
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(regex_pattern: str):
+            try:
+                return func(regex_pattern)
+            except Exception:
+                return default
+
+        return wrapper
+
+    return decorator
+
+
+@lru_cache(maxsize=128)
+@_fallback_on_error(b"")
+def _required_literal(regex_pattern: str) -> bytes:
+    """
+    Return the longest literal every match of the pattern must contain, UTF-8 encoded,
+    or b"" when none can be derived safely.
+
+    Only literals at the top level of the pattern are considered: they are concatenated
+    with the rest of it, so no alternation or repetition can make them optional.
+    """
+    pattern = _compile_pattern(regex_pattern)
+    if pattern.flags & (re.IGNORECASE | re.LOCALE):
+        return b""
+
+    best, run = "", []
+    parsed = sre_parse.parse(regex_pattern, pattern.flags)
+    for op, value in chain(parsed, [(None, None)]):
+        if op is sre_parse.LITERAL:
+            run.append(chr(value))
+            continue
+        if len(run) > len(best):
+            best = "".join(run)
+        run = []
+
+    # Text-mode reads translate line endings, so newlines may differ from the file's bytes
+    if "\n" in best or "\r" in best:
+        return b""
+    return best.encode("utf-8")
+
+
+def _is_bytes_safe(items) -> bool:
+    """
+    Whether a parsed pattern matches UTF-8 bytes exactly as it matches the decoded text.
+
+    That holds when it only uses ASCII literals and ranges: anything that matches "one
+    character" (".", negated classes) or a Unicode category ("\\w", "\\b", ...) would match
+    differently on bytes.
+    """
+    for op, value in items:
+        if op is sre_parse.LITERAL:
+            if value >= 128:
+                return False
+        elif op is sre_parse.IN:
+            for item_op, item_value in value:
+                if item_op is sre_parse.LITERAL:
+                    if item_value >= 128:
+                        return False
+                elif item_op is not sre_parse.RANGE or item_value[1] >= 128:
+                    return False
+        elif op is sre_parse.AT:
+            if value in (sre_parse.AT_BOUNDARY, sre_parse.AT_NON_BOUNDARY):
+                return False
+        elif op in (
+            sre_parse.MAX_REPEAT,
+            sre_parse.MIN_REPEAT,
+            sre_parse.POSSESSIVE_REPEAT,
+        ):
+            if not _is_bytes_safe(value[2]):
+                return False
+        elif op is sre_parse.SUBPATTERN:
+            if value[1] & re.IGNORECASE or not _is_bytes_safe(value[3]):
+                return False
+        elif op is sre_parse.BRANCH:
+            if not all(_is_bytes_safe(branch) for branch in value[1]):
+                return False
+        elif op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            if not _is_bytes_safe(value[1]):
+                return False
+        elif op is sre_parse.ATOMIC_GROUP:
+            if not _is_bytes_safe(value):
+                return False
+        elif op is not sre_parse.GROUPREF:
+            return False
+    return True
+
+
+@lru_cache(maxsize=128)
+@_fallback_on_error(None)
+def _bytes_pattern(regex_pattern: str) -> Optional[re.Pattern]:
+    """Compile the pattern for matching raw UTF-8 lines, or None if it would match differently."""
+    pattern = _compile_pattern(regex_pattern)
+    if pattern.flags & (re.IGNORECASE | re.LOCALE) or not regex_pattern.isascii():
+        return None
+    if not _is_bytes_safe(sre_parse.parse(regex_pattern, pattern.flags)):
+        return None
+    try:
+        return re.compile(regex_pattern.encode("ascii"))
+    except re.error:
+        return None
+
+
+def _never_matches_newline(items) -> bool:
+    """Whether a parsed (bytes-safe) pattern can never match or look past a line break."""
+    for op, value in items:
+        if op is sre_parse.LITERAL:
+            if value == 10:
+                return False
+        elif op is sre_parse.IN:
+            for item_op, item_value in value:
+                if item_op is sre_parse.LITERAL and item_value == 10:
+                    return False
+                if item_op is sre_parse.RANGE and item_value[0] <= 10 <= item_value[1]:
+                    return False
+        elif op is sre_parse.AT:
+            if value in (sre_parse.AT_BEGINNING_STRING, sre_parse.AT_END_STRING):
+                return False
+        elif op in (
+            sre_parse.MAX_REPEAT,
+            sre_parse.MIN_REPEAT,
+            sre_parse.POSSESSIVE_REPEAT,
+        ):
+            if not _never_matches_newline(value[2]):
+                return False
+        elif op is sre_parse.SUBPATTERN:
+            if not _never_matches_newline(value[3]):
+                return False
+        elif op is sre_parse.BRANCH:
+            if not all(_never_matches_newline(branch) for branch in value[1]):
+                return False
+        elif op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            if not _never_matches_newline(value[1]):
+                return False
+        elif op is sre_parse.ATOMIC_GROUP:
+            if not _never_matches_newline(value):
+                return False
+    return True
+
+
+@lru_cache(maxsize=128)
+@_fallback_on_error(None)
+def _whole_file_pattern(regex_pattern: str) -> Optional[re.Pattern]:
+    """
+    Compile the pattern for a single finditer pass over a whole file, or None if it could
+    match differently than line by line.
+
+    Matches never span lines when the pattern cannot match a newline, and in MULTILINE
+    mode "^"/"$" then match at exactly the line boundaries they match per line.
+    """
+    if _bytes_pattern(regex_pattern) is None:
+        return None
+    if not _never_matches_newline(
+        sre_parse.parse(regex_pattern, _compile_pattern(regex_pattern).flags)
+    ):
+        return None
+    return re.compile(regex_pattern.encode("ascii"), re.MULTILINE)
 
 
 @dataclass
@@ -15,7 +255,6 @@ class SearchResult:
 
     @classmethod
     def format_results(cls, results: List["SearchResult"], directory_path: str) -> str:
-        MAX_RESULTS = 250
         output = []
 
         if len(results) >= MAX_RESULTS:
@@ -26,13 +265,10 @@ class SearchResult:
             result_text = "1 result" if len(results) == 1 else f"{len(results)} results"
             output.append(f"Found {result_text}.\n")
 
-        # Group results by file
-        grouped_results = {}
+        # Group results by file (result.file already includes the searched directory)
+        grouped_results = defaultdict(list)
         for result in results[:MAX_RESULTS]:
-            file_path = Path(directory_path) / result.file
-            if file_path not in grouped_results:
-                grouped_results[file_path] = []
-            grouped_results[file_path].append(result)
+            grouped_results[result.file].append(result)
 
         # Format results
         for file_path, file_results in grouped_results.items():
@@ -84,36 +320,306 @@ class SearchFile(BaseTool):
         regex_pattern: str,
         file_pattern: Optional[str] = None,
     ) -> str:
-        import re
-        from pathlib import Path
-
+        _compile_pattern(regex_pattern)  # Fail fast on an invalid pattern
         file_pattern = file_pattern or "*"
-        results = []
-        directory = Path(directory_path)
 
-        for file_path in directory.rglob(file_pattern):
-            if not file_path.is_file():
-                continue
+        # The walk is lazy: it stops as soon as enough results have been found
+        files = _iter_files(directory_path, file_pattern)
+        head = list(islice(files, _PARALLEL_MIN_FILES))
 
-            try:
-                with open(file_path, "r", encoding="utf-8") as f:
-                    lines = f.readlines()
-
-                for i, line in enumerate(lines):
-                    if re.search(regex_pattern, line):
-                        before_context = lines[max(0, i - 1) : i]
-                        after_context = lines[i + 1 : i + 2]
-
-                        results.append(
-                            SearchResult(
-                                file=str(file_path.relative_to(directory)),
-                                line=i + 1,
-                                match_line=line,
-                                before_context=before_context,
-                                after_context=after_context,
-                            )
-                        )
-            except (UnicodeDecodeError, IOError):
-                continue  # Skip files that can't be read
+        if len(head) < _PARALLEL_MIN_FILES:
+            results = _scan_batch(head, regex_pattern, MAX_RESULTS)
+        else:
+            # The scan is CPU-bound on the regex engine, so spread it over processes.
+            # Batches are collected in submission order, keeping results in walk order.
+            loop = asyncio.get_running_loop()
+            pool = _get_process_pool()
+            files = chain(head, files)
+            in_flight = deque()
+            results = []
+            for batch in iter(lambda: list(islice(files, _BATCH_SIZE)), []):
+                in_flight.append(
+                    loop.run_in_executor(
+                        pool, _scan_batch, batch, regex_pattern, MAX_RESULTS
+                    )
+                )
+                if len(in_flight) >= _MAX_IN_FLIGHT:
+                    results.extend(await in_flight.popleft())
+                    if len(results) >= MAX_RESULTS:
+                        break
+            while in_flight and len(results) < MAX_RESULTS:
+                results.extend(await in_flight.popleft())
+            for future in in_flight:
+                future.cancel()
 
         return SearchResult.format_results(results, directory_path)
+
+    @staticmethod
+    def _scan_file(
+        file_path: str,
+        pattern: re.Pattern,
+        needle: bytes = b"",
+        bytes_pattern: Optional[re.Pattern] = None,
+        whole_pattern: Optional[re.Pattern] = None,
+    ) -> List[SearchResult]:
+        """Search one file line by line, keeping only the previous line for context."""
+        with open(file_path, "rb") as raw:
+            # A NUL byte near the start means a binary file (image, .pyc, .so): not worth scanning
+            if b"\x00" in raw.read(_BINARY_PEEK_SIZE):
+                return []
+            raw.seek(0)
+
+            # Files without the required literal cannot match: skip the regex scan entirely
+            if needle and not SearchFile._contains(raw, needle):
+                return []
+            raw.seek(0)
+
+            # Prefer one regex pass over the whole file, then an undecoded line scan;
+            # each returns None when the file needs a scanner closer to text mode
+            file_results = None
+            if whole_pattern is not None:
+                file_results = SearchFile._scan_whole_file(
+                    raw.read(), file_path, whole_pattern
+                )
+                raw.seek(0)
+            if file_results is None and bytes_pattern is not None:
+                file_results = SearchFile._scan_lines_bytes(
+                    raw, file_path, bytes_pattern
+                )
+                raw.seek(0)
+
+            if file_results is not None:
+                if file_results:
+                    # The text scan skips files that are not valid UTF-8; so does this one
+                    decoder = codecs.getincrementaldecoder("utf-8")()
+                    while chunk := raw.read(_PREFILTER_CHUNK_SIZE):
+                        decoder.decode(chunk)
+                    decoder.decode(b"", final=True)
+                return file_results
+
+            return SearchFile._scan_lines_text(
+                io.TextIOWrapper(raw, encoding="utf-8"), file_path, pattern
+            )
+
+    @staticmethod
+    def _scan_lines_text(
+        f: io.TextIOWrapper, file_path: str, pattern: re.Pattern
+    ) -> List[SearchResult]:
+        """Scan decoded lines (universal newlines) for the pattern."""
+        file_results = []
+        previous_line = None
+        pending = None  # Last match, still waiting for its after-context line
+
+        for line_number, line in enumerate(f, start=1):
+            if pending is not None:
+                pending.after_context.append(line)
+                pending = None
+
+            if pattern.search(line):
+                pending = SearchResult(
+                    file=file_path,
+                    line=line_number,
+                    match_line=line,
+                    before_context=[] if previous_line is None else [previous_line],
+                    after_context=[],
+                )
+                file_results.append(pending)
+
+            previous_line = line
+
+        return file_results
+
+    @staticmethod
+    def _scan_lines_bytes(
+        raw: BinaryIO, file_path: str, bytes_pattern: re.Pattern
+    ) -> Optional[List[SearchResult]]:
+        """
+        Scan undecoded lines for the pattern, decoding only matches and their context.
+
+        CRLF endings are normalized as text mode would; returns None if the file has other
+        carriage returns, which text mode treats as line breaks, so the caller rescans it.
+        """
+        file_results = []
+        previous_line = None
+        pending = None  # Last match, still waiting for its after-context line
+
+        for line_number, line in enumerate(raw, start=1):
+            if b"\r" in line:
+                if not line.endswith(b"\r\n") or b"\r" in line[:-2]:
+                    return None
+                line = line[:-2] + b"\n"
+
+            if pending is not None:
+                pending.after_context.append(line.decode("utf-8"))
+                pending = None
+
+            if bytes_pattern.search(line):
+                pending = SearchResult(
+                    file=file_path,
+                    line=line_number,
+                    match_line=line.decode("utf-8"),
+                    before_context=[]
+                    if previous_line is None
+                    else [previous_line.decode("utf-8")],
+                    after_context=[],
+                )
+                file_results.append(pending)
+
+            previous_line = line
+
+        return file_results
+
+    @staticmethod
+    def _scan_whole_file(
+        data: bytes, file_path: str, whole_pattern: re.Pattern
+    ) -> Optional[List[SearchResult]]:
+        """
+        Find all matches in one regex pass over the file, then cut out the matched lines.
+
+        Returns None for files with carriage returns, whose line endings text mode would
+        translate, so the caller falls back to a line scan.
+        """
+        if b"\r" in data:
+            return None
+
+        file_results = []
+        line_number = 1  # Line number at position counted_to
+        counted_to = 0
+        last_line_start = -1
+        for match in whole_pattern.finditer(data):
+            start = match.start()
+            # An empty match after the final newline is not on any line
+            if start == len(data) and (not data or data.endswith(b"\n")):
+                break
+            line_start = data.rfind(b"\n", 0, start) + 1
+            if line_start == last_line_start:
+                continue  # One result per line
+            last_line_start = line_start
+
+            line_number += data.count(b"\n", counted_to, line_start)
+            counted_to = line_start
+
+            line_end = data.find(b"\n", start)
+            line_end = len(data) if line_end == -1 else line_end + 1
+            after_end = data.find(b"\n", line_end)
+            after_end = len(data) if after_end == -1 else after_end + 1
+
+            before_context = []
+            if line_start:
+                before_start = data.rfind(b"\n", 0, line_start - 1) + 1
+                before_context.append(data[before_start:line_start].decode("utf-8"))
+
+            file_results.append(
+                SearchResult(
+                    file=file_path,
+                    line=line_number,
+                    match_line=data[line_start:line_end].decode("utf-8"),
+                    before_context=before_context,
+                    after_context=[data[line_end:after_end].decode("utf-8")]
+                    if line_end < len(data)
+                    else [],
+                )
+            )
+
+        return file_results
+
+    @staticmethod
+    def _contains(f: BinaryIO, needle: bytes) -> bool:
+        """Check whether a binary file contains needle, reading it in bounded chunks."""
+        if os.fstat(f.fileno()).st_size > _MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                # One sequential pass: let the kernel read ahead aggressively
+                if hasattr(mm, "madvise"):
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                    mm.madvise(mmap.MADV_WILLNEED)
+                return mm.find(needle) != -1
+
+        overlap = len(needle) - 1
+        tail = b""
+        while chunk := f.read(_PREFILTER_CHUNK_SIZE):
+            window = tail + chunk
+            if needle in window:
+                return True
+            tail = window[-overlap:] if overlap else b""
+        return False
+
+
+# Directories that never hold code worth searching: VCS metadata, installed packages and
+# bytecode. Narrower than SimpleListFiles.IGNORE_PATTERNS, since names like build, out or
+# vendor are often real source directories.
+_SEARCH_IGNORE_DIRS = frozenset(
+    {".git", ".hg", ".svn", "node_modules", "__pycache__", "venv", ".venv"}
+)
+
+
+@lru_cache(maxsize=32)
+def _name_filter(file_pattern: str) -> Callable[[str], Any]:
+    """Build (once per pattern) the test for file names matching a glob."""
+    if any(c in file_pattern for c in "*?["):
+        return re.compile(fnmatch.translate(file_pattern)).match
+    # An exact file name: plain string comparison, no pattern matching at all
+    return file_pattern.__eq__
+
+
+def _iter_files(directory_path: str, file_pattern: str) -> Iterator[str]:
+    """
+    Yield files below directory_path whose name matches file_pattern, depth first.
+
+    os.scandir entries carry their file type from the directory read, so no Path objects
+    or extra stat calls are needed. Symlinked directories and _SEARCH_IGNORE_DIRS are
+    pruned before descending, so their subtrees are never read.
+    """
+    if "/" in file_pattern or os.sep in file_pattern:
+        # Multi-segment patterns match the trailing part of the relative path, as rglob does
+        def matches(path: str) -> bool:
+            return PurePath(os.path.relpath(path, directory_path)).match(file_pattern)
+
+        match_on_path = True
+    else:
+        matches = _name_filter(file_pattern)
+        match_on_path = False
+
+    stack = [directory_path]
+    while stack:
+        current = stack.pop()
+        subdirs = []
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in _SEARCH_IGNORE_DIRS:
+                            subdirs.append(entry.path)
+                    elif (
+                        matches(entry.path if match_on_path else entry.name)
+                        and entry.is_file()
+                    ):
+                        yield entry.path
+        except OSError:
+            continue
+        # Reversed so directories are visited in scandir order
+        stack.extend(reversed(subdirs))
+
+
+def _scan_batch(
+    file_paths: List[str], regex_pattern: str, limit: Optional[int] = None
+) -> List[SearchResult]:
+    """Search a batch of files; runs in the caller or in a worker process (compiled patterns are cached per process)."""
+    pattern = _compile_pattern(regex_pattern)
+    needle = _required_literal(regex_pattern)
+    bytes_pattern = _bytes_pattern(regex_pattern)
+    whole_pattern = _whole_file_pattern(regex_pattern)
+    results = []
+
+    for file_path in file_paths:
+        try:
+            results.extend(
+                SearchFile._scan_file(
+                    file_path, pattern, needle, bytes_pattern, whole_pattern
+                )
+            )
+        except (UnicodeDecodeError, IOError):
+            continue  # Skip files that can't be read
+        if limit is not None and len(results) >= limit:
+            break
+
+    return results
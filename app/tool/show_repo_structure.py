@@ -7,10 +7,14 @@ from rich.tree import Tree
 from app.tool import BaseTool
 
 
+# Directories never shown in the structure (hidden entries are skipped as well)
+_SKIP_DIRS = frozenset({'node_modules', 'dist'})
+
+
 @dataclass
 class RepoStructure:
     path: str  # Project directory path
-    files: Dict[str, Optional[Dict]]  # Actual file structure
+    files: Dict[str, Optional[Dict]]  # Actual file structure, each level in name order
     explanations: Dict[str, str]  # Directory/file explanations
 
     def to_string(self) -> str:
@@ -19,9 +23,9 @@ class RepoStructure:
         project_name = os.path.basename(root_path)
         lines = [f"{project_name} ({root_path})"]
 
-        def build_tree(items: Dict, level: int = 0):
-            for name, contents in sorted(items.items()):
-                indent = "    " * level
+        def build_tree(items: Dict, indent: str = ""):
+            # scan_directory inserts entries already sorted, so no per-level sort is needed
+            for name, contents in items.items():
                 is_dir = isinstance(contents, dict)
 
                 # Add item with explanation if available
@@ -34,7 +38,7 @@ class RepoStructure:
 
                 # Recurse for directories
                 if is_dir and contents:
-                    build_tree(contents, level + 1)
+                    build_tree(contents, indent + "    ")
 
         build_tree(self.files)
         return "\n".join(lines)
@@ -60,10 +64,14 @@ class ShowRepoStructureTool(BaseTool):
     def _create_tree(self, directory: str, tree: Tree) -> None:
         """Recursively create a tree structure."""
         try:
-            # Sort directories first, then files
-            entries = os.listdir(directory)
-            dirs = [e for e in entries if os.path.isdir(os.path.join(directory, e))]
-            files = [e for e in entries if os.path.isfile(os.path.join(directory, e))]
+            # Sort directories first, then files; scandir entries already know their type
+            dirs, files = [], []
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        dirs.append(entry.name)
+                    elif entry.is_file():
+                        files.append(entry.name)
 
             # Sort both lists
             dirs.sort()
@@ -71,7 +79,7 @@ class ShowRepoStructureTool(BaseTool):
 
             # Process directories
             for entry in dirs:
-                if entry.startswith('.') or entry in ['node_modules', 'dist']:
+                if entry.startswith('.') or entry in _SKIP_DIRS:
                     continue
                 path = os.path.join(directory, entry)
                 branch = tree.add(f"📁 [bold blue]{entry}[/]")
@@ -90,15 +98,18 @@ class ShowRepoStructureTool(BaseTool):
         def scan_directory(directory: str) -> Dict:
             result = {}
             try:
-                for entry in sorted(os.listdir(directory)):
-                    if entry.startswith('.') or entry in ['node_modules', 'dist']:
-                        continue
-
-                    full_path = os.path.join(directory, entry)
-                    if os.path.isdir(full_path):
-                        result[entry] = scan_directory(full_path)
+                # Drop skipped entries while reading, so only the rest are sorted
+                with os.scandir(directory) as it:
+                    entries = [
+                        e for e in it if not e.name.startswith('.') and e.name not in _SKIP_DIRS
+                    ]
+                entries.sort(key=lambda e: e.name)
+
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        result[entry.name] = scan_directory(entry.path)
                     else:
-                        result[entry] = None
+                        result[entry.name] = None
                 return result
             except Exception:
                 return {}
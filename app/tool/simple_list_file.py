@@ -1,5 +1,6 @@
 import os
 import time
+from collections import deque
 from pathlib import Path
 from typing import List, Set, Optional
 
@@ -35,24 +36,22 @@ class ListFilesResult:
                     current[part] = {}
                 current = current[part]
 
-        # Format output
-        def format_tree(tree, indent="", is_last=True):
-            lines = []
-            items = list(tree.items())
-
-            for i, (name, subtree) in enumerate(items):
-                is_last_item = i == len(items) - 1
-                prefix = indent + ("    " if is_last else "    ")
-
+        # Format output: depth-first with an explicit stack of (remaining items, indent),
+        # appending every line to a single list
+        lines = []
+        stack = [(iter(tree.items()), "")]
+        while stack:
+            items, indent = stack[-1]
+            for name, subtree in items:
                 if subtree:  # It's a directory
                     lines.append(f"{indent}{name}/")
-                    lines.extend(format_tree(subtree, prefix, is_last_item))
-                else:  # It's a file
-                    lines.append(f"{indent}{name}")
-
-            return lines
+                    stack.append((iter(subtree.items()), indent + "    "))
+                    break
+                lines.append(f"{indent}{name}")  # It's a file
+            else:
+                stack.pop()
 
-        output = "\n".join(format_tree(tree))
+        output = "\n".join(lines)
 
         if self.limit_reached:
             output += f"\n\nNote: File limit reached. Some files may not be shown."
@@ -71,6 +70,35 @@ class SimpleListFiles:
     FILES_LIMIT = 100000
     TIMEOUT_SECONDS = 10
 
+    # Common directories to ignore
+    IGNORE_PATTERNS = frozenset({
+        "node_modules",
+        "__pycache__",
+        "env",
+        "venv",
+        "target",
+        ".target",
+        "build",
+        "dist",
+        "out",
+        "bundle",
+        "vendor",
+        "tmp",
+        "temp",
+        "deps",
+        "pkg",
+        ".git",
+        ".svn",
+        '.env.miner',
+        '.git',
+        '.gitattributes',
+        '.gitignore',
+        '.idea',
+        '.pre-commit-config.yaml',
+        'LICENSE',
+        'README.md',
+    })
+
     @staticmethod
     def is_root_or_home(dir_path: Path) -> bool:
         """Check if the given path is root or home directory."""
@@ -81,7 +109,8 @@ class SimpleListFiles:
     @staticmethod
     def should_ignore(path: Path, ignore_patterns: Set[str]) -> bool:
         """Check if the path should be ignored based on patterns."""
-        return any(part in ignore_patterns for part in path.parts)
+        # Ancestors were already checked when the walk entered them
+        return path.name in ignore_patterns
 
     @staticmethod
     def list_files(directory_path: Path, recursive: bool = True) -> ListFilesResult:
@@ -94,47 +123,21 @@ class SimpleListFiles:
                 files=[], limit_reached=False
             )
 
+        ignore_patterns = SimpleListFiles.IGNORE_PATTERNS
+
         # Initialize variables
         results: List[Path] = []
         start_time = time.time()
-        queue: List[Path] = [dir_path]
-        visited: Set[Path] = set()
-
-        # Common directories to ignore
-        ignore_patterns = {
-            "node_modules",
-            "__pycache__",
-            "env",
-            "venv",
-            "target",
-            ".target",
-            "build",
-            "dist",
-            "out",
-            "bundle",
-            "vendor",
-            "tmp",
-            "temp",
-            "deps",
-            "pkg",
-            ".git",
-            ".svn",
-            '.env.miner',
-            '.git',
-            '.gitattributes',
-            '.gitignore',
-            '.idea',
-            '.pre-commit-config.yaml',
-            'LICENSE',
-            'README.md',
-        }
+        # Directories are tracked as plain strings: cheaper to hash than Path objects
+        queue = deque([str(dir_path)])
+        visited: Set[str] = set()
 
         while queue and len(results) < SimpleListFiles.FILES_LIMIT:
             # Check timeout
             if time.time() - start_time > SimpleListFiles.TIMEOUT_SECONDS:
                 return ListFilesResult(files=results, limit_reached=True)
 
-            current_dir = queue.pop(0)
+            current_dir = queue.popleft()
             if current_dir in visited:
                 continue
 
@@ -142,19 +145,19 @@ class SimpleListFiles:
 
             try:
                 for entry in os.scandir(current_dir):
-                    entry_path = Path(entry.path)
+                    name = entry.name
 
                     # Skip if should be ignored
-                    if SimpleListFiles.should_ignore(entry_path, ignore_patterns):
+                    if name in ignore_patterns:
                         continue
 
-                    # Add files (Python files only)
-                    if entry.is_file() and entry_path.suffix == ".py":
-                        results.append(entry_path)
+                    # Add files (Python files only); a bare ".py" has no suffix, as with Path.suffix
+                    if name.endswith(".py") and len(name) > 3 and entry.is_file():
+                        results.append(Path(entry.path))
 
                     # Add directory to queue if recursive
-                    if recursive and entry.is_dir() and not entry.name.startswith("."):
-                        queue.append(entry_path)
+                    if recursive and entry.is_dir() and not name.startswith("."):
+                        queue.append(entry.path)
 
                     # Check file limit
                     if len(results) >= SimpleListFiles.FILES_LIMIT:
@@ -1,5 +1,5 @@
 """Collection classes for managing multiple tools."""
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 from pydantic import BaseModel
 
@@ -13,21 +13,27 @@ class ToolCollection:
     def __init__(self, *tools: BaseTool):
         self.tools = tools
         self.tool_map = {tool.name: tool for tool in tools}
+        # Bound execute methods, so a call is a dict lookup plus a direct await
+        self._execute_map = {tool.name: tool.execute for tool in tools}
+        # Function-call schemas sent on every LLM request; built once until a tool is added
+        self._params: Optional[List[Dict[str, Any]]] = None
 
     def __iter__(self):
         return iter(self.tools)
 
     def to_params(self) -> List[Dict[str, Any]]:
-        return [tool.to_param() for tool in self.tools]
+        if self._params is None:
+            self._params = [tool.to_param() for tool in self.tools]
+        return self._params
 
     async def execute(
         self, *, name: str, tool_input: Dict[str, Any] = None
     ) -> ToolResult:
-        tool = self.tool_map.get(name)
-        if not tool:
+        execute = self._execute_map.get(name)
+        if not execute:
             return ToolFailure(error=f"Tool {name} is invalid")
         try:
-            result = await tool(**tool_input)
+            result = await execute(**(tool_input or {}))
             return result
         except ToolError as e:
             return ToolFailure(error=e.message)
@@ -49,6 +55,8 @@ class ToolCollection:
     def add_tool(self, tool: BaseTool):
         self.tools += (tool,)
         self.tool_map[tool.name] = tool
+        self._execute_map[tool.name] = tool.execute
+        self._params = None
         return self
 
     def add_tools(self, *tools: BaseTool):
@@ -1,9 +1,86 @@
-from typing import List, Optional, Literal
+import asyncio
+import os
+from typing import Dict, List, Optional, Literal, Tuple
+
+from pydantic import PrivateAttr
 
 from app.tool import Bash
 from app.tool.base import BaseTool
 from app.tool.oh_editor import OHEditor
 
+# Files larger than this are shown as their first and last lines when no range is given
+_LARGE_VIEW_BYTES = 256 * 1024
+_HEAD_LINES = 400
+_TAIL_LINES = 200
+_READ_BLOCK = 64 * 1024
+
+try:
+    # libgit2 diffs in-process, without spawning git and reloading the index per call
+    import pygit2
+except ImportError:
+    pygit2 = None
+
+
+# Opened repositories, keyed by their .git directory
+_repositories: Dict[str, "pygit2.Repository"] = {}
+
+
+def _pygit2_diff(path: str, full_diff: bool) -> str:
+    """Return the unified diff for path (unstaged, or staged and unstaged against HEAD for full_diff)."""
+    path = os.path.abspath(path)
+    git_dir = pygit2.discover_repository(path)
+    if git_dir is None:
+        raise RuntimeError(f"{path} is not inside a git repository")
+    repo = _repositories.get(git_dir)
+    if repo is None:
+        repo = _repositories[git_dir] = pygit2.Repository(git_dir)
+    else:
+        # Pick up index changes made since the last call (re-read only if modified on disk)
+        repo.index.read(False)
+
+    rel = os.path.relpath(path, repo.workdir).replace(os.sep, "/")
+    # Repository.diff has no pathspec, so keep the patches under path like `git diff <path>`
+    prefix = "" if rel == "." else rel + "/"
+    if full_diff:
+        # Like `git diff HEAD`: HEAD against the index, then the index against the workdir.
+        # A plain tree-to-workdir diff would miss files that are only staged (newly added).
+        diff = repo.revparse_single("HEAD").peel(pygit2.Tree).diff_to_index(repo.index)
+        diff.merge(repo.index.diff_to_workdir())
+    else:
+        diff = repo.diff(cached=False)
+    return "".join(
+        patch.text for patch in diff
+        if any(
+            p == rel or p.startswith(prefix)
+            for p in (patch.delta.old_file.path, patch.delta.new_file.path)
+        )
+    )
+
+
+def _read_tail(path: str, count: int) -> Tuple[int, List[str]]:
+    """Return the file's line count and its last count lines, without loading the whole file."""
+    with open(path, "rb") as f:
+        newlines = 0
+        last = b""
+        for block in iter(lambda: f.read(16 * _READ_BLOCK), b""):
+            newlines += block.count(b"\n")
+            last = block
+        total = newlines + (1 if last and not last.endswith(b"\n") else 0)
+
+        # Walk back from the end one block at a time until enough lines are buffered
+        pos = f.seek(0, os.SEEK_END)
+        data = b""
+        while pos > 0 and data.count(b"\n") <= count:
+            step = min(_READ_BLOCK, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+
+    if data.endswith(b"\n"):
+        data = data[:-1]
+    lines = data.decode("utf-8", errors="replace").split("\n")[-count:]
+    return total, lines
+
 
 class View(BaseTool):
     name: str = "view"
@@ -42,6 +119,13 @@ class View(BaseTool):
 
     editor: OHEditor = OHEditor()
 
+    # One shell per tool for its diff views: starting a bash session per call dominated their
+    # cost. The lock keeps concurrent diff views from interleaving commands in that shell.
+    # Both belong to the event loop they were made on and are replaced under a new loop.
+    _shell: Optional[Bash] = PrivateAttr(default=None)
+    _shell_lock: Optional[asyncio.Lock] = PrivateAttr(default=None)
+    _shell_loop: Optional[asyncio.AbstractEventLoop] = PrivateAttr(default=None)
+
     async def execute(
             self,
             path: str,
@@ -64,6 +148,8 @@ class View(BaseTool):
             or diff output depending on the view_mode
         """
         if view_mode == "normal":
+            if view_range is None and os.path.isfile(path) and os.path.getsize(path) > _LARGE_VIEW_BYTES:
+                return await self._view_large_file(path)
             # Use standard editor view
             return await self.editor.execute(
                 command="view",
@@ -71,8 +157,14 @@ class View(BaseTool):
                 view_range=view_range
             )
 
-        # For diff views, we'll use the shell command tool
-        shell_tool = Bash()
+        if pygit2 is not None:
+            try:
+                output = _pygit2_diff(path, full_diff=view_mode == "full_diff")
+            except Exception:
+                # Anything libgit2 cannot handle goes through the git CLI below
+                pass
+            else:
+                return output if output.strip() else f"No changes detected in {path}"
 
         if view_mode == "diff":
             # Show only unstaged changes
@@ -82,10 +174,18 @@ class View(BaseTool):
             command = f"git diff HEAD {path}"
 
         try:
-            result = await shell_tool.execute(command=command)
-            if not result.strip():
+            loop = asyncio.get_running_loop()
+            if self._shell_loop is not loop:
+                self._shell, self._shell_lock, self._shell_loop = None, asyncio.Lock(), loop
+            async with self._shell_lock:
+                if self._shell is None:
+                    self._shell = Bash()
+                result = await self._shell.execute(command=command)
+            if result.error and not result.output:
+                raise RuntimeError(result.error)
+            if not result.output.strip():
                 return f"No changes detected in {path}"
-            return result
+            return result.output
         except Exception as e:
             # Fallback to normal view if git commands fail
             # (e.g., if file is not in git repository)
@@ -98,3 +198,19 @@ class View(BaseTool):
                         view_range=view_range
                     )
             )
+
+    async def _view_large_file(self, path: str) -> str:
+        """View the head and tail of a large file instead of its whole content."""
+        total, tail = await asyncio.to_thread(_read_tail, path, _TAIL_LINES)
+        if total <= _HEAD_LINES + _TAIL_LINES:
+            return await self.editor.execute(command="view", path=path)
+
+        head = await self.editor.execute(command="view", path=path, view_range=[1, _HEAD_LINES])
+        head = head.rstrip("\n")
+        tail_start = total - len(tail) + 1
+        omitted = tail_start - _HEAD_LINES - 1
+        return (
+            f"{head}\n"
+            f"... [{omitted} lines omitted; use view_range to see them] ...\n"
+            + "\n".join(f"{i:6}\t{line.expandtabs()}" for i, line in enumerate(tail, start=tail_start))
+        )
@@ -1,11 +1,23 @@
-from typing import Literal, Optional
-from urllib.parse import urljoin
+import asyncio
+import hashlib
+import time
+from pathlib import Path
+from typing import Literal, Optional, Tuple
 
 import html2text
+import httpx
 from pydantic import model_validator
 
 from app.tool.base import BaseTool
 from app.tool.browser import Browser, BrowserOutput
+from app.utils.shutdown_listener import add_cleanup_handler
+
+
+try:
+    # With use_cache, pages read before are served from disk instead of another browser navigation
+    import diskcache
+except ImportError:
+    diskcache = None
 
 
 WEB_READ_DESCRIPTION = """Read (convert to markdown) content from a webpage. You should prefer using the `webpage_read` tool over the `browser` tool, but do use the `browser` tool if you need to interact with a webpage (e.g., click a button, fill out a form, etc.).
@@ -13,6 +25,71 @@ You may use the `webpage_read` tool to read content from a webpage, and even sea
 """
 
 
+# html2text converters can be reused call after call, so every WebRead shares one
+_SHARED_HTML2TEXT = html2text.HTML2Text()
+_SHARED_HTML2TEXT.ignore_links = False
+_SHARED_HTML2TEXT.ignore_images = True
+_SHARED_HTML2TEXT.images_to_alt = True
+_SHARED_HTML2TEXT.body_width = 0
+
+
+WEB_READ_CACHE_DIR = Path.home() / ".cache" / "agenthub" / "webread"
+_CACHE_SIZE_LIMIT = 2**30
+# Pages served without ETag/Last-Modified cannot be revalidated, so they expire instead
+_UNVALIDATED_TTL = 3600
+_REVALIDATE_TIMEOUT = 5
+_page_cache: Optional["diskcache.Cache"] = None
+
+
+def _get_page_cache() -> Optional["diskcache.Cache"]:
+    """Open the shared on-disk page cache on first use (None without diskcache)."""
+    global _page_cache
+    if _page_cache is None and diskcache is not None:
+        _page_cache = diskcache.Cache(
+            str(WEB_READ_CACHE_DIR),
+            size_limit=_CACHE_SIZE_LIMIT,
+            eviction_policy="least-recently-used",
+        )
+    return _page_cache
+
+
+async def _request_validators(
+    url: str, entry: Optional[dict] = None
+) -> Tuple[Optional[int], dict]:
+    """HEAD url (conditionally if entry has validators); return status and validators."""
+    headers = {}
+    if entry:
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+    try:
+        async with httpx.AsyncClient(
+            follow_redirects=True, timeout=_REVALIDATE_TIMEOUT
+        ) as client:
+            response = await client.head(url, headers=headers)
+            return response.status_code, {
+                "etag": response.headers.get("etag"),
+                "last_modified": response.headers.get("last-modified"),
+            }
+    except httpx.HTTPError:
+        return None, {"etag": None, "last_modified": None}
+
+
+_URL_SCHEMES = ("http://", "https://", "file://")
+_shared_browser: Optional[Browser] = None
+
+
+def _get_shared_browser() -> Browser:
+    """Launch the browser shared by all WebRead tools on first use."""
+    global _shared_browser
+    if _shared_browser is None:
+        # Each launch starts a whole browser process; Browser.execute serializes the reads
+        _shared_browser = Browser()
+        add_cleanup_handler(_shared_browser.close)
+    return _shared_browser
+
+
 class WebRead(BaseTool):
     """Tool for reading and converting webpage content to markdown"""
 
@@ -32,17 +109,15 @@ class WebRead(BaseTool):
     browser: Optional[Browser] = None
     html_converter: Optional[html2text.HTML2Text] = None
     trigger_by_action: Literal["browse"] = "browse"
+    # Serve pages read before from the on-disk cache (needs diskcache)
+    use_cache: bool = False
 
     @model_validator(mode="after")
     def initialize(self):
         """Initialize browser and HTML converter with optimal settings"""
         if not self.browser:
-            self.browser = Browser()
-            self.html_converter = html2text.HTML2Text()
-            self.html_converter.ignore_links = False
-            self.html_converter.ignore_images = True
-            self.html_converter.images_to_alt = True
-            self.html_converter.body_width = 0
+            self.browser = _get_shared_browser()
+            self.html_converter = _SHARED_HTML2TEXT
         return self
 
     async def execute(self, url: str, wait_time: int = 1000) -> BrowserOutput:
@@ -50,15 +125,53 @@ class WebRead(BaseTool):
         try:
             # Normalize URL
             normalized_url = (
-                urljoin("https://", url)
-                if not url.startswith(("http://", "https://", "file://"))
-                else url
+                url if url.startswith(_URL_SCHEMES) else "https://" + url.lstrip("/")
             )
 
-            # Execute browser navigation
-            result = await self.browser.execute(
-                f'goto("{normalized_url}")\nnoop({wait_time})'
-            )
+            action = f'goto("{normalized_url}")\nnoop({wait_time})'
+            cache = _get_page_cache() if self.use_cache else None
+            if cache is None:
+                # Execute browser navigation
+                return await self.browser.execute(action)
+
+            # Keyed on the whole browser action, so a different wait_time renders anew
+            key = hashlib.blake2b(action.encode()).hexdigest()
+            entry = cache.get(key)
+            validators = None
+            if entry is not None:
+                if entry["etag"] or entry["last_modified"]:
+                    status, validators = await _request_validators(
+                        normalized_url, entry
+                    )
+                if validators is None or status == 304:
+                    return BrowserOutput(
+                        output=entry["markdown"],
+                        url=entry["url"],
+                        trigger_by_action=self.trigger_by_action,
+                    )
+
+            if validators is None:
+                # Fetch the validators to store while the page renders
+                result, (_, validators) = await asyncio.gather(
+                    self.browser.execute(action), _request_validators(normalized_url)
+                )
+            else:
+                # The revalidation response already carries the new validators
+                result = await self.browser.execute(action)
+
+            if result.output and not result.error:
+                cache.set(
+                    key,
+                    {
+                        **validators,
+                        "markdown": result.output,
+                        "url": result.url,
+                        "fetched_at": time.time(),
+                    },
+                    expire=None
+                    if validators["etag"] or validators["last_modified"]
+                    else _UNVALIDATED_TTL,
+                )
 
             return result
 
@@ -66,8 +179,8 @@ class WebRead(BaseTool):
             return BrowserOutput(error=f"Failed to read webpage: {str(e)}", url=url)
 
     def close(self):
-        """Close the browser tool."""
-        if self.browser is not None:
+        """Close the browser tool (the shared browser is closed on shutdown instead)."""
+        if self.browser is not None and self.browser is not _shared_browser:
             self.browser.close()
 
 
@@ -78,6 +191,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    import asyncio
-
     asyncio.run(main())
@@ -1,3 +1,5 @@
+import asyncio
+import os
 from typing import Dict, Any
 
 from app.tool.base import BaseTool
@@ -19,6 +21,26 @@ Requirements:
 """
 
 
+# Files with more characters than this skip the editor and are written from one encoded buffer
+_DIRECT_WRITE_CHARS = 1024 * 1024
+
+
+def _invalid_path(path: str, hint: str) -> str:
+    """Format a rejected path the way the editor reports it."""
+    return f"ERROR:\nInvalid `path` parameter: {path}. {hint}"
+
+
+def _write_new_file(path: str, data: bytes) -> None:
+    """Create path (failing if it exists) and write data without an intermediate copy."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
 class WriteCode(BaseTool):
     name: str = "write_code"
     description: str = WRITE_CODE_DESCRIPTION
@@ -57,6 +79,26 @@ Example: '/workspace/src/utils.py'
         if not file_text.strip():
             raise ValueError("Code implementation cannot be empty")
 
+        if len(file_text) > _DIRECT_WRITE_CHARS:
+            # Same checks and messages as the editor's `create`
+            if not os.path.isabs(path):
+                return _invalid_path(
+                    path, "The path should be an absolute path, starting with `/`."
+                )
+            try:
+                await asyncio.to_thread(_write_new_file, path, file_text.encode("utf-8"))
+            except FileExistsError:
+                return _invalid_path(
+                    path, f"File already exists at: {path}. Cannot overwrite files using command `create`."
+                )
+            except FileNotFoundError:
+                return _invalid_path(
+                    path, f"The parent directory {os.path.dirname(path)} does not exist."
+                )
+            except OSError as e:
+                return f"ERROR:\nRan into {e} while trying to write to {path}"
+            return f"File created successfully at: {path}"
+
         # Create new file with implemented code
         result = await self.editor.execute(
             command="create",
@@ -1,4 +1,25 @@
 import re
+from typing import Optional
+
+
+_FENCE_RE = re.compile(r'```[\w]*\n|```')
+# Header of a const/function component; its body runs to the final closing brace
+_COMPONENT_HEAD_RE = re.compile(r"(?:const|function)\s+\w+\s*=?\s*(?:\([^)]*\))?\s*=>?\s*{")
+_BLANK_LINES_RE = re.compile(r'\n\s*\n')
+
+
+def _find_element(text: str, tag: str) -> Optional[str]:
+    """Return the first <tag ...>...</tag> span in text, found by literal scanning."""
+    start = text.find(f"<{tag}")
+    if start == -1:
+        return None
+    open_end = text.find(">", start + len(tag) + 1)
+    if open_end == -1:
+        return None
+    end = text.find(f"</{tag}>", open_end + 1)
+    if end == -1:
+        return None
+    return text[start:end + len(tag) + 3]
 
 
 def extract_html_content(text: str, stack: str = "react-tailwind") -> str:
@@ -13,36 +34,40 @@ def extract_html_content(text: str, stack: str = "react-tailwind") -> str:
         str: Extracted code content
     """
     # Remove markdown code blocks if present
-    text = re.sub(r'```[\w]*\n|```', '', text)
+    if '```' in text:
+        text = _FENCE_RE.sub('', text)
 
     if stack == "svg":
         # Extract SVG content
-        svg_match = re.search(r"(<svg.*?>.*?</svg>)", text, re.DOTALL)
-        if svg_match:
-            return svg_match.group(1)
+        svg = _find_element(text, "svg")
+        if svg:
+            return svg
     elif stack == "react-tailwind":
-        # Extract React component content
-        react_match = re.search(r"(export default function.*?})\s*$", text, re.DOTALL)
-        if react_match:
-            return react_match.group(1)
-        # Alternative: look for const/function component definition
-        alt_match = re.search(r"((?:const|function)\s+\w+\s*=?\s*(?:\([^)]*\))?\s*=>?\s*{.*?})\s*$", text, re.DOTALL)
-        if alt_match:
-            return alt_match.group(1)
+        # A component runs from its header to the closing brace that ends the response
+        stripped = text.rstrip()
+        if stripped.endswith('}'):
+            # Extract React component content
+            start = stripped.find("export default function")
+            if start != -1:
+                return stripped[start:]
+            # Alternative: look for const/function component definition
+            alt_match = _COMPONENT_HEAD_RE.search(stripped)
+            if alt_match:
+                return stripped[alt_match.start():]
 
     # Default: try to extract content within <html> tags
-    html_match = re.search(r"(<html.*?>.*?</html>)", text, re.DOTALL)
-    if html_match:
-        return html_match.group(1)
+    html = _find_element(text, "html")
+    if html:
+        return html
 
     # If no specific patterns match, try to extract any HTML-like content
-    body_match = re.search(r"(<body.*?>.*?</body>)", text, re.DOTALL)
-    if body_match:
-        return f"<html>\n{body_match.group(1)}\n</html>"
+    body = _find_element(text, "body")
+    if body:
+        return f"<html>\n{body}\n</html>"
 
-    div_match = re.search(r"(<div.*?>.*?</div>)", text, re.DOTALL)
-    if div_match:
-        return f"<html>\n<body>\n{div_match.group(1)}\n</body>\n</html>"
+    div = _find_element(text, "div")
+    if div:
+        return f"<html>\n<body>\n{div}\n</body>\n</html>"
 
     # If no patterns match, clean up the text and return it
     cleaned_text = text.strip()
@@ -64,7 +89,7 @@ def clean_code_content(code: str) -> str:
     code = code.strip()
 
     # Remove extra blank lines
-    code = re.sub(r'\n\s*\n', '\n\n', code)
+    code = _BLANK_LINES_RE.sub('\n\n', code)
 
     # Ensure proper indentation
     lines = code.split('\n')
@@ -6,16 +6,42 @@ import asyncio
 import signal
 import sys
 import threading
-import time
+import weakref
 from types import FrameType
-from typing import Optional, Callable, List
+from typing import Callable, List, Optional
 
 from uvicorn.server import HANDLED_SIGNALS
 
 from app.logger import logger
 
+
 _should_exit = None
 
+# Set on shutdown so sleepers wake immediately instead of polling _should_exit
+_exit_event = threading.Event()
+# One asyncio.Event per event loop, since they cannot be shared across loops
+_async_exit_events: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Event]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _get_async_exit_event() -> asyncio.Event:
+    loop = asyncio.get_running_loop()
+    event = _async_exit_events.get(loop)
+    if event is None:
+        event = _async_exit_events[loop] = asyncio.Event()
+    return event
+
+
+def _set_exit_events():
+    _exit_event.set()
+    for loop, event in list(_async_exit_events.items()):
+        try:
+            loop.call_soon_threadsafe(event.set)
+        except RuntimeError:
+            # The loop is already closed; nothing is waiting on it
+            pass
+
 
 def _register_signal_handler(sig: signal.Signals):
     original_handler = None
@@ -24,6 +50,7 @@ def _register_signal_handler(sig: signal.Signals):
         logger.debug(f"shutdown_signal:{sig_}")
         global _should_exit
         _should_exit = True
+        _set_exit_events()
         if original_handler:
             original_handler(sig_, frame)  # type: ignore[unreachable]
 
@@ -58,21 +85,18 @@ def should_continue() -> bool:
 
 
 def sleep_if_should_continue(timeout: float):
-    if timeout <= 1:
-        time.sleep(timeout)
-        return
-    start_time = time.time()
-    while (time.time() - start_time) < timeout and should_continue():
-        time.sleep(1)
+    if should_continue():
+        _exit_event.wait(timeout)
 
 
 async def async_sleep_if_should_continue(timeout: float):
-    if timeout <= 1:
-        await asyncio.sleep(timeout)
+    event = _get_async_exit_event()
+    if not should_continue():
         return
-    start_time = time.time()
-    while time.time() - start_time < timeout and should_continue():
-        await asyncio.sleep(1)
+    try:
+        await asyncio.wait_for(event.wait(), timeout)
+    except asyncio.TimeoutError:
+        pass
 
 
 # ----- Shutdown Listener -----
@@ -97,19 +121,35 @@ async def _shutdown():
     _shutdown_in_progress = True
     logger.info("Executing shutdown sequence")
 
-    # Execute all cleanup handlers
-    for handler in _cleanup_handlers:
-        try:
-            if asyncio.iscoroutinefunction(handler):
-                await handler()
-            else:
-                handler()
-        except Exception as e:
-            logger.error(f"Error in shutdown handler: {e}")
+    # Run all cleanup handlers at once, so shutdown takes as long as the slowest one;
+    # blocking handlers (e.g. closing a browser) run on the default executor
+    loop = asyncio.get_running_loop()
+    results = await asyncio.gather(
+        *(
+            handler()
+            if asyncio.iscoroutinefunction(handler)
+            else loop.run_in_executor(None, handler)
+            for handler in _cleanup_handlers
+        ),
+        return_exceptions=True,
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            logger.error(f"Error in shutdown handler: {result}")
 
     logger.info("Shutdown complete")
 
 
+async def run_cleanup_handlers():
+    """
+    Run the registered cleanup handlers now.
+
+    For entry points that finish without a shutdown signal (the CLI, the benchmark runner),
+    so shared resources such as browsers, HTTP clients and process pools are still closed.
+    """
+    await _shutdown()
+
+
 def _signal_handler(sig, frame):
     """Handle termination signals by scheduling the shutdown coroutine"""
     logger.info(f"Received signal {sig}, initiating shutdown")
@@ -128,6 +168,12 @@ def _signal_handler(sig, frame):
         sys.exit(1)
 
 
+def _schedule_shutdown(loop: asyncio.AbstractEventLoop, sig: signal.Signals):
+    """Start the shutdown coroutine; runs on the loop thread via loop.add_signal_handler"""
+    logger.info(f"Received signal {sig}, initiating shutdown")
+    loop.create_task(_shutdown())
+
+
 def register_shutdown_handler(handler: Optional[Callable] = None):
     """
     Register signal handlers for graceful shutdown.
@@ -138,6 +184,28 @@ def register_shutdown_handler(handler: Optional[Callable] = None):
     """
     global _original_loop
 
+    # Register the cleanup handler if provided
+    if handler is not None:
+        _cleanup_handlers.append(handler)
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+
+    if loop is not None:
+        # Let the running loop deliver the signals itself, so shutdown is scheduled
+        # on its own thread rather than from inside an interrupted frame
+        try:
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                loop.add_signal_handler(sig, _schedule_shutdown, loop, sig)
+            _original_loop = loop
+            logger.debug("Registered shutdown handler")
+            return handler  # Return the handler for use as a decorator
+        except (NotImplementedError, RuntimeError, ValueError):
+            # Not supported on this platform or outside the main thread
+            pass
+
     # Store the original event loop for later use
     if _original_loop is None:
         try:
@@ -147,11 +215,7 @@ def register_shutdown_handler(handler: Optional[Callable] = None):
             _original_loop = asyncio.new_event_loop()
             asyncio.set_event_loop(_original_loop)
 
-    # Register the cleanup handler if provided
-    if handler is not None:
-        _cleanup_handlers.append(handler)
-
-    # Register signal handlers if not already done
+    # No loop is running: fall back to process-level signal handlers
     signal.signal(signal.SIGINT, _signal_handler)
     signal.signal(signal.SIGTERM, _signal_handler)
 
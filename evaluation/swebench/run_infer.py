@@ -1,24 +1,54 @@
 import argparse
 import asyncio
+import concurrent.futures
+import functools
+import hashlib
+import importlib
+import io
 import json
+import mmap
 import os
+import re
 import shutil
 import sys
+from collections import defaultdict
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List
+from typing import Callable, Dict, List, Optional, Tuple
+
+from datasets import load_from_disk
 
-from app.agent import TaoAgent
-from app.agent.code_alchemist import CodeAlchemistAgent
-from app.agent.codeact import CodeActAgent
-from app.agent.midwit import MidwitAgent
-from app.agent.swe import SWEAgent
 from app.config import PROJECT_ROOT, WORKSPACE_ROOT, config
 from app.logger import logger
 from app.tool import Terminal
+from app.utils.shutdown_listener import run_cleanup_handlers
 from evaluation.swebench.utils import load_hf_dataset
 
 
+try:
+    # orjson serializes the predictions (with their long patches) several times faster
+    import orjson
+
+    def _json_line(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+
+except ImportError:
+
+    def _json_line(obj) -> bytes:
+        return (json.dumps(obj) + "\n").encode("utf-8")
+
+
+try:
+    # A faster drop-in event loop for the subprocess- and socket-heavy runs, when installed
+    import uvloop
+except ImportError:
+    uvloop = None
+
+# An unescaped quote cannot occur inside a JSON string, so this only matches the key itself;
+# the optional space covers both orjson's and json's separators
+_INSTANCE_ID_RE = re.compile(rb'"instance_id": ?"((?:[^"\\]|\\.)*)"')
+
+
 INSTANCE_TEMPLATE = f"""
 <uploaded_files>
 {{working_dir}}
@@ -73,6 +103,22 @@ Your approach should be systematic and thorough.
 """
 
 
+def _lazy_agent(module: str, name: str) -> Callable[[], type]:
+    """Return a loader that imports the agent class the first time it is called"""
+
+    @functools.cache
+    def load() -> type:
+        return getattr(importlib.import_module(module), name)
+
+    return load
+
+
+@functools.lru_cache(maxsize=2048)
+def _repo_key(repo: str, version: str) -> str:
+    """Name shared by everything set up for one repo at one version"""
+    return f"{repo.replace('/', '__').replace('-', '_')}_{version}"
+
+
 class DatasetConfig:
     """Configuration for dataset management"""
 
@@ -82,12 +128,13 @@ class DatasetConfig:
         "mini": "manna-ai/SWE-Verified_Mini",
         "full": "princeton-nlp/SWE-bench_Verified",
     }
-    AGENT_MAPPINGS = {
-        "swe": SWEAgent,
-        "codeact": CodeActAgent,
-        "midwit": MidwitAgent,
-        "tao": TaoAgent,
-        "code_alchemist": CodeAlchemistAgent,
+    # Only the agent a run selects is imported, along with its tool and LLM stack
+    AGENT_MAPPINGS: Dict[str, Callable[[], type]] = {
+        "swe": _lazy_agent("app.agent.swe", "SWEAgent"),
+        "codeact": _lazy_agent("app.agent.codeact", "CodeActAgent"),
+        "midwit": _lazy_agent("app.agent.midwit", "MidwitAgent"),
+        "tao": _lazy_agent("app.agent", "TaoAgent"),
+        "code_alchemist": _lazy_agent("app.agent.code_alchemist", "CodeAlchemistAgent"),
     }
     TEST_REPO_DIR = Path("/Users/manna/data/test_repo")
     DATA_DIR = PROJECT_ROOT / "data/hugging_face"
@@ -99,11 +146,19 @@ class DatasetConfig:
         return cls.MAPPINGS.get(data_mode, cls.MAPPINGS["nano"])
 
 
+# LFS objects are not needed to check out a commit for evaluation
+_GIT_ENV = "GIT_LFS_SKIP_SMUDGE=1"
+
+# One lock per golden repo, shared by every RepositoryManager in the process
+_golden_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+
 class RepositoryManager:
     """Manages git repository operations"""
 
-    def __init__(self, base_dir: Path):
+    def __init__(self, base_dir: Path, mirror_dir: Optional[Path] = None):
         self.base_dir = base_dir
+        self.mirror_dir = mirror_dir
         self.terminal = Terminal()
 
     async def __aenter__(self):
@@ -113,77 +168,156 @@ class RepositoryManager:
         await self.terminal.close()
 
     def get_repo_path(self, instance: dict) -> Path:
-        """Generate repository path from instance information"""
-        return self.base_dir / (
-            instance["repo"].replace("-", "_").replace("/", "__")
-            + "_"
-            + instance["version"]
-        )
+        """Generate the worktree path of an instance"""
+        return self.base_dir / "worktrees" / instance["instance_id"]
+
+    def get_golden_path(self, repo_identifier: str) -> Path:
+        """Generate the path of the bare repo that a repo's worktrees are added from"""
+        return self.base_dir / ".golden" / f"{repo_identifier.replace('/', '__')}.git"
 
     async def refresh_repo(self, instance: dict, reclone: bool = False) -> Path:
-        """Refresh or clone repository based on instance information"""
+        """Reset the instance's worktree, or add it from the repo's golden clone"""
         repo_path = self.get_repo_path(instance)
         if repo_path.exists() and reclone:
             logger.info(f"Removing existing repo path: {repo_path.absolute()}")
-            shutil.rmtree(repo_path)
+            # Deleting a large checkout takes seconds; keep the event loop free meanwhile
+            await asyncio.to_thread(shutil.rmtree, repo_path)
 
+        # Command output is collected and logged once, rather than per command
+        buf = io.StringIO()
         if repo_path.exists():
-            await self._handle_existing_repo(repo_path)
+            await self._handle_existing_repo(repo_path, buf)
         else:
-            await self._clone_new_repo(
-                repo_path, instance["repo"], instance["base_commit"]
+            await self._add_worktree(
+                repo_path, instance["repo"], instance["base_commit"], buf
             )
+        logger.info(buf.getvalue())
 
-        logger.info(await self.terminal.execute(f"pwd"))
         return repo_path
 
-    async def _handle_existing_repo(self, repo_path: Path):
+    async def remove_worktree(self, instance: dict):
+        """Remove the instance's worktree once its patch has been saved"""
+        repo_path = self.get_repo_path(instance)
+        golden_path = self.get_golden_path(instance["repo"])
+        buf = io.StringIO()
+        async with _golden_locks[instance["repo"]]:
+            await self._run_command(
+                f"git -C {golden_path.absolute()} worktree remove --force {repo_path.absolute()}",
+                buf,
+            )
+        logger.info(buf.getvalue())
+
+    async def _handle_existing_repo(self, repo_path: Path, buf: io.StringIO):
         """Handle operations for existing repository"""
         logger.info(f"Resetting existing repo path: {repo_path.absolute()}")
-        commands = [
-            f"cd {repo_path.absolute()}",
-            "git reset --hard && git clean -n -d && git clean -f -d",
-            "git rev-parse --abbrev-ref HEAD | xargs git checkout",
-            "git branch",
-            "pwd",
-        ]
-        for cmd in commands:
-            await self._run_command(cmd)
-
-    async def _clone_new_repo(
-        self, repo_path: Path, repo_identifier: str, base_commit: str
+        await self._run_in_repo(
+            repo_path,
+            [
+                "git reset --hard",
+                "git clean -n -d",
+                "git clean -f -d",
+                "git rev-parse --abbrev-ref HEAD | xargs git checkout",
+                "git branch",
+                "pwd",
+            ],
+            buf,
+        )
+
+    async def _ensure_golden(self, repo_identifier: str, buf: io.StringIO) -> Path:
+        """Clone the repo's golden bare repo once; the caller holds its lock"""
+        golden_path = self.get_golden_path(repo_identifier)
+        if golden_path.exists():
+            return golden_path
+
+        logger.info(f"Cloning golden repo to path: {golden_path}")
+        remote_url = f"https://github.com/{repo_identifier}.git"
+        bundle = (
+            self.mirror_dir / f"{repo_identifier.replace('/', '__')}.bundle"
+            if self.mirror_dir
+            else None
+        )
+        # Only trees and commits are cloned; blobs are fetched lazily by the checkouts.
+        # A local bundle, when present, replaces the network clone.
+        source = (
+            f"{bundle.absolute()}" if bundle and bundle.exists() else f"'{remote_url}'"
+        )
+        await self._run_command(
+            f"{_GIT_ENV} git clone --bare --filter=blob:none --no-tags "
+            f"{source} {golden_path.absolute()}",
+            buf,
+        )
+        await self._run_command(
+            f"git -C {golden_path.absolute()} remote set-url origin '{remote_url}'", buf
+        )
+        return golden_path
+
+    async def _add_worktree(
+        self, repo_path: Path, repo_identifier: str, base_commit: str, buf: io.StringIO
     ):
-        """Clone a new repository"""
-        logger.info(f"Cloning repo to path: {repo_path}")
-        commands = [
-            f"git clone 'https://github.com/{repo_identifier}.git' {repo_path.absolute()}",
-            f"cd {repo_path.absolute()}"
-            + (f" && git checkout -f {base_commit}" if base_commit else ""),
-            "git branch",
-            "pwd",
-        ]
-        for cmd in commands:
-            await self._run_command(cmd)
-
-    async def get_git_diff(self, repo_path: Path) -> str:
-        """Get git diff for modified files"""
-        commands = [
-            f"cd {repo_path.absolute()} ",
-            "echo '.backup.*' >> .gitignore",
-            "git add -A",
-            "git diff --cached",
-        ]
-        output = ""
-        for cmd in commands:
-            output = await self._run_command(cmd)
+        """Check the base commit out into a new worktree of the repo's golden clone"""
+        logger.info(f"Adding worktree at path: {repo_path}")
+        # Instances of the same repo share the golden clone, so they update it in turn
+        async with _golden_locks[repo_identifier]:
+            golden = (await self._ensure_golden(repo_identifier, buf)).absolute()
+            commands = [
+                # Forget worktrees whose directories were deleted, so the path can be reused
+                f"git -C {golden} worktree prune",
+            ]
+            if base_commit:
+                # The commit is usually in the cloned history; otherwise fetch just that commit
+                commands.append(
+                    f"(git -C {golden} cat-file -e {base_commit}^{{commit}} 2>/dev/null"
+                    f" || {_GIT_ENV} git -C {golden} fetch --depth=1 --no-tags origin {base_commit})"
+                )
+            commands.append(
+                f"{_GIT_ENV} git -C {golden} worktree add --detach {repo_path.absolute()} "
+                f"{base_commit or 'HEAD'}"
+            )
+            await self._run_command("; ".join(commands), buf)
+        await self._run_in_repo(repo_path, ["git branch", "pwd"], buf)
+
+    async def get_git_diff(self, repo_path: Path, patch_path: Path) -> str:
+        """Get git diff for modified files, also kept at patch_path"""
+        buf = io.StringIO()
+        await self._run_in_repo(
+            repo_path, ["echo '.backup.*' >> .gitignore", "git add -A"], buf
+        )
+        logger.info(buf.getvalue())
+
+        # git writes the diff straight into the file instead of through the terminal's
+        # captured output; on its own, warnings from `git add` cannot end up in the patch
+        patch_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(patch_path, "wb") as fp:
+            proc = await asyncio.create_subprocess_exec(
+                "git",
+                "diff",
+                "--cached",
+                cwd=repo_path,
+                stdout=fp,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            _, stderr = await proc.communicate()
+        if proc.returncode != 0:
+            logger.error(
+                f"git diff failed in {repo_path}: {stderr.decode(errors='replace')}"
+            )
+        return patch_path.read_text(encoding="utf-8", errors="replace")
+
+    async def _run_in_repo(
+        self, repo_path: Path, commands: List[str], buf: io.StringIO
+    ) -> str:
+        """Run commands inside the repository as one shell invocation"""
+        # Terminal handles `cd` itself and splits commands on '&', so the rest are joined
+        # with ';' (each still runs even if an earlier one fails, as when sent one by one)
+        await self._run_command(f"cd {repo_path.absolute()}", buf)
+        return await self._run_command("; ".join(commands), buf)
+
+    async def _run_command(self, cmd: str, buf: io.StringIO) -> str:
+        """Execute a command in terminal, recording it and its output in buf"""
+        output = str(await self.terminal.execute(cmd))
+        buf.write(f"$ {cmd}\n{output}\n")
         return output
 
-    async def _run_command(self, cmd: str) -> str:
-        """Execute a command in terminal and return output"""
-        output = await self.terminal.execute(cmd)
-        logger.info(f"Command: {cmd}\nOutput:\n{output}")
-        return str(output)
-
 
 class BenchmarkRunner:
     """Main class for running the SWE benchmark"""
@@ -191,21 +325,68 @@ class BenchmarkRunner:
     def __init__(self, args: argparse.Namespace):
         self.args = args
         self.result_dir = Path(args.save_folder)
-        self.repo_manager = RepositoryManager(Path(args.test_repo_dir))
+        # Start loading the dataset right away; it is awaited when run() begins
+        self._dataset_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self._dataset_future = self._dataset_executor.submit(self._load_dataset)
+        # An instance and the prefetch of its worktree take turns on it
+        self._repo_locks: Dict[Path, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self._preds_fd: Optional[int] = None
+        # Background clones of upcoming instances' repos, keyed by instance id
+        self._prefetched: Dict[str, asyncio.Task] = {}
+        self._dataset = None
+        # The solution steps are fixed for the whole run, so they are filled in once
+        self._instance_template = INSTANCE_TEMPLATE.replace(
+            "{solution_steps}",
+            SOLUTION_STEPS if args.reproduce else SOLUTION_STEPS_WITHOUT_REPRODUCE,
+        )
+        self._done_ids = self._load_done_ids()
 
     async def run(self):
         """Main execution flow"""
-        dataset = self._load_dataset()
+        try:
+            dataset = self._dataset = await asyncio.wrap_future(self._dataset_future)
+        finally:
+            self._dataset_executor.shutdown(wait=False)
         self.result_dir.mkdir(parents=True, exist_ok=True)
+        # Each prediction goes out in one O_APPEND write, so concurrent lines never interleave
+        self._preds_fd = os.open(
+            self.result_dir / "all_preds.jsonl",
+            os.O_WRONLY | os.O_CREAT | os.O_APPEND,
+            0o644,
+        )
+
+        logger.remove()
+        logger.add(sys.stderr, level="INFO")
 
-        async with self.repo_manager:
-            for index, instance in enumerate(dataset):
-                await self._run_instance(index, instance)
+        # Instances are dominated by git, subprocess and LLM latency, so several run at once
+        semaphore = asyncio.Semaphore(self.args.concurrency)
+
+        async def _one(index: int, instance: dict):
+            async with semaphore:
+                # Each instance drives its own terminal, whose working directory is stateful
+                async with RepositoryManager(
+                    Path(self.args.test_repo_dir),
+                    Path(self.args.mirror_dir) if self.args.mirror_dir else None,
+                ) as repo_manager:
+                    with logger.contextualize(instance_id=instance["instance_id"]):
+                        await self._run_instance(index, instance, repo_manager)
+
+        try:
+            results = await asyncio.gather(
+                *(_one(index, instance) for index, instance in enumerate(dataset)),
+                return_exceptions=True,
+            )
+            await asyncio.gather(*self._prefetched.values(), return_exceptions=True)
+        finally:
+            os.close(self._preds_fd)
+            self._preds_fd = None
+        for instance, result in zip(dataset, results):
+            if isinstance(result, Exception):
+                logger.error(f"Instance {instance['instance_id']} failed: {result}")
 
     def _load_dataset(self):
         """Load and filter dataset based on instance IDs"""
         dataset_path = DatasetConfig.get_dataset_path()
-        dataset = self._load_hf_dataset(dataset_path)
 
         # Get instance IDs from args or fallback to default
         instance_ids = self.args.instance_ids
@@ -216,11 +397,25 @@ class BenchmarkRunner:
         elif instance_ids == ["all"]:
             # Select all instances
             logger.info("Using all available instances")
-            return dataset
+            return self._load_hf_dataset(dataset_path)
+
+        # Filtered datasets are saved by content key, so repeated runs skip loading the full one
+        instance_ids = sorted(id.strip() for id in instance_ids)
+        key = hashlib.sha1(
+            json.dumps([dataset_path, instance_ids]).encode()
+        ).hexdigest()
+        cache_path = DatasetConfig.DATA_DIR / "filtered" / f"{key}.arrow"
+        if cache_path.exists():
+            logger.info(f"Loading filtered dataset from {cache_path}")
+            return load_from_disk(str(cache_path))
 
         # Filter dataset by instance IDs
         logger.info(f"Filtering dataset for instance IDs: {instance_ids}")
-        return self._filter_dataset(dataset, instance_ids)
+        dataset = self._filter_dataset(
+            self._load_hf_dataset(dataset_path), instance_ids
+        )
+        dataset.save_to_disk(str(cache_path))
+        return dataset
 
     @staticmethod
     def _load_hf_dataset(dataset_path: str):
@@ -235,54 +430,146 @@ class BenchmarkRunner:
     @staticmethod
     def _filter_dataset(dataset, instance_ids: List[str]):
         """Filter dataset based on instance IDs"""
-        instance_ids = [id.strip() for id in instance_ids]
-        return dataset.filter(
-            lambda x: x["instance_id"] in instance_ids,
-            desc="Filtering out existing ids",
-            load_from_cache_file=True,
+        # Only the id column is read; select() avoids filter()'s per-row Python calls
+        wanted = {id.strip() for id in instance_ids}
+        return dataset.select(
+            [
+                i
+                for i, instance_id in enumerate(dataset["instance_id"])
+                if instance_id in wanted
+            ]
         )
 
-    async def _run_instance(self, index: int, instance: dict):
+    async def _run_instance(
+        self, index: int, instance: dict, repo_manager: RepositoryManager
+    ):
         """Run a single instance of the benchmark"""
         if not self._should_run_instance(instance):
             logger.info(f"Instance {instance['instance_id']} already exists, skipping")
             return
 
-        self._setup_logging(index, instance)
-        await self._execute_instance(instance)
+        sink_id = self._setup_logging(index, instance)
+        try:
+            async with self._repo_locks[repo_manager.get_repo_path(instance)]:
+                await self._execute_instance(index, instance, repo_manager)
+        finally:
+            logger.remove(sink_id)
 
-    def _should_run_instance(self, instance: dict) -> bool:
-        """Check if instance should be run"""
+    def _load_done_ids(self) -> set:
+        """Read the ids of instances already saved to the output file, once per run"""
         output_file = self.result_dir / "all_preds.jsonl"
-        if not output_file.exists():
-            return True
+        if not output_file.exists() or not output_file.stat().st_size:
+            return set()
 
-        with open(output_file, "r") as fp:
-            return not any(
-                json.loads(line.strip())["instance_id"] == instance["instance_id"]
-                for line in fp
-            )
+        # Scan the mapped file for the ids instead of parsing every (multi-KB) line
+        with open(output_file, "rb") as fp:
+            with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return {
+                    json.loads(b'"' + match.group(1) + b'"')
+                    for match in _INSTANCE_ID_RE.finditer(mm)
+                }
 
-    def _setup_logging(self, index: int, instance: dict):
-        """Setup logging for instance"""
-        logger.remove()
-        logger.add(sys.stderr, level="INFO")
-        logger.add(
-            self.result_dir / "logs" / f"{index + 1}_{instance['instance_id']}.log",
+    def _should_run_instance(self, instance: dict) -> bool:
+        """Check if instance should be run"""
+        return instance["instance_id"] not in self._done_ids
+
+    def _setup_logging(self, index: int, instance: dict) -> int:
+        """Setup logging for instance; returns the id of its log sink"""
+        instance_id = instance["instance_id"]
+        # Only records logged while running this instance go to its file
+        return logger.add(
+            self.result_dir / "logs" / f"{index + 1}_{instance_id}.log",
             level="DEBUG",
+            filter=lambda record: record["extra"].get("instance_id") == instance_id,
         )
 
-    async def _execute_instance(self, instance: dict):
+    def _prefetch_next_repo(self, index: int, repo_manager: RepositoryManager):
+        """Start cloning the repo of the instance that will take over this slot"""
+        # Instances are admitted in order, so the one after the running batch is next
+        next_index = index + self.args.concurrency
+        if self.args.reclone_existing_repo or next_index >= len(self._dataset):
+            return
+        instance = self._dataset[next_index]
+        repo_path = repo_manager.get_repo_path(instance)
+        if (
+            not self._should_run_instance(instance)
+            or instance["instance_id"] in self._prefetched
+            or repo_path.exists()
+        ):
+            return
+        self._prefetched[instance["instance_id"]] = asyncio.create_task(
+            self._prefetch_repo(instance, repo_path)
+        )
+
+    async def _prefetch_repo(self, instance: dict, repo_path: Path):
+        """Clone a repo ahead of its instance; the instance waits on the same repo lock"""
+        async with self._repo_locks[repo_path]:
+            if repo_path.exists():
+                return
+            # A separate manager, since the running instance's terminal is stateful
+            async with RepositoryManager(
+                Path(self.args.test_repo_dir),
+                Path(self.args.mirror_dir) if self.args.mirror_dir else None,
+            ) as repo_manager:
+                try:
+                    await repo_manager.refresh_repo(instance)
+                except Exception as e:
+                    logger.warning(f"Prefetching {repo_path} failed: {e}")
+                    # Leave no partial clone behind; the instance clones it again itself
+                    await asyncio.to_thread(
+                        shutil.rmtree, repo_path, ignore_errors=True
+                    )
+
+    async def _execute_instance(
+        self, index: int, instance: dict, repo_manager: RepositoryManager
+    ):
         """Execute instance and save results"""
+        instance_id = instance["instance_id"]
+        checkpoint = self.result_dir / "cache" / f"{instance_id}.state.json"
+        repo_path = repo_manager.get_repo_path(instance)
+        if self.args.reclone_existing_repo or not repo_path.exists():
+            # The agent's edits are gone, so the checkpoint no longer describes anything
+            checkpoint.unlink(missing_ok=True)
+
+        if checkpoint.exists():
+            # The agent finished on an earlier attempt and its edits are still in the
+            # worktree; only the patch was not saved, so pick up from there
+            logger.info(f"**** Resuming {instance_id} from {checkpoint} ****")
+            model_name = json.loads(checkpoint.read_text())["model_name"]
+        else:
+            repo_path, model_name = await self._run_agent(index, instance, repo_manager)
+            checkpoint.parent.mkdir(parents=True, exist_ok=True)
+            checkpoint.write_text(
+                json.dumps(
+                    {"model_name": model_name, "timestamp": datetime.now().isoformat()}
+                )
+            )
+
+        instance["model_name_or_path"] = model_name
+
+        instance["model_patch"] = await self.generate_patch(
+            repo_path,
+            self.result_dir / "patches" / f"{instance_id}.patch",
+            repo_manager,
+        )
+        logger.info(f"Model patch:\n{instance['model_patch']}")
+
+        await self._save_predictions(instance)
+        await repo_manager.remove_worktree(instance)
+        checkpoint.unlink(missing_ok=True)
+
+    async def _run_agent(
+        self, index: int, instance: dict, repo_manager: RepositoryManager
+    ) -> Tuple[Path, str]:
+        """Run the agent on a fresh worktree; returns the worktree and the model used"""
         logger.info(f"**** Preparing to run {instance['instance_id']} ****")
-        repo_path = await self.repo_manager.refresh_repo(
+        repo_path = await repo_manager.refresh_repo(
             instance, self.args.reclone_existing_repo
         )
 
-        agent = DatasetConfig.AGENT_MAPPINGS[self.args.agent](
-            max_steps=self.args.max_steps
-        )
-        env_name = await self.get_env_name(instance)
+        agent_cls = DatasetConfig.AGENT_MAPPINGS[self.args.agent]()
+        agent = agent_cls(max_steps=self.args.max_steps)
+        env_name = self.get_env_name(instance)
         if not hasattr(agent, "env_name") or not agent.env_name:
             setattr(agent, "env_name", env_name)
         user_requirement = self._prepare_requirement(instance, repo_path)
@@ -290,51 +577,38 @@ class BenchmarkRunner:
         logger.info(f"**** Starting to run {instance['instance_id']} ****")
         logger.info("User Requirement:\n" + user_requirement)
 
+        # The agent is dominated by LLM latency, which leaves time to clone the next repo
+        self._prefetch_next_repo(index, repo_manager)
         await agent.run(user_requirement)
         logger.info(f"**** Finished running {instance['instance_id']} ****")
 
-        instance["model_name_or_path"] = agent.llm.model
-
-        repo_path = self.repo_manager.get_repo_path(instance)
-        instance["model_patch"] = await self.generate_patch(repo_path)
-        logger.info(f"Model patch:\n{instance['model_patch']}")
-
-        await self._save_predictions(instance)
+        return repo_path, agent.llm.model
 
     @staticmethod
-    async def get_env_name(instance):
-        repo = instance["repo"]
-        env_name = ""
-        if not env_name:
-            repo_prefix = repo.replace("/", "__").replace("-", "_")
-            version = instance["version"]
-            env_name = f"{repo_prefix}_{version}"
-
-        return env_name
+    def get_env_name(instance):
+        return _repo_key(instance["repo"], instance["version"])
 
-    @staticmethod
-    def _prepare_requirement(instance: dict, repo_path: Path) -> str:
+    def _prepare_requirement(self, instance: dict, repo_path: Path) -> str:
         """Prepare user request text"""
-        return INSTANCE_TEMPLATE.format(
+        return self._instance_template.format(
             problem_statement=instance["problem_statement"],
-            hints_text=instance["hints_text"],
             working_dir=repo_path.absolute(),
-            solution_steps=SOLUTION_STEPS
-            if args.reproduce
-            else SOLUTION_STEPS_WITHOUT_REPRODUCE,
         )
 
-    async def generate_patch(self, repo_path: Path) -> str:
+    @staticmethod
+    async def generate_patch(
+        repo_path: Path, patch_path: Path, repo_manager: RepositoryManager
+    ) -> str:
         """Generate git diff patch for the repository"""
-        return await self.repo_manager.get_git_diff(repo_path)
+        return await repo_manager.get_git_diff(repo_path, patch_path)
 
     async def _save_predictions(self, instance: dict):
         """Save predictions to output file"""
         output_file = self.result_dir / "all_preds.jsonl"
         logger.info(f"Saving predictions to {output_file}")
 
-        with open(output_file, "a+") as fp:
-            print(json.dumps(instance), file=fp, flush=True)
+        os.write(self._preds_fd, _json_line(instance))
+        self._done_ids.add(instance["instance_id"])
 
         logger.info(f"Saved prediction of {instance['instance_id']}")
 
@@ -355,6 +629,12 @@ def parse_args() -> argparse.Namespace:
         help="Directory to save temporary repositories",
         type=str,
     )
+    parser.add_argument(
+        "--mirror_dir",
+        default=None,
+        help="Directory of local '<owner>__<repo>.bundle' files to clone from instead of GitHub",
+        type=str,
+    )
     parser.add_argument(
         "-s",
         "--save_folder",
@@ -388,6 +668,13 @@ def parse_args() -> argparse.Namespace:
         type=int,
         help="Maximum number of steps to run the agent",
     )
+    parser.add_argument(
+        "-c",
+        "--concurrency",
+        default=1,
+        type=int,
+        help="Number of instances to run at the same time",
+    )
     parser.add_argument(
         "--instance_ids",
         nargs="+",
@@ -397,7 +684,15 @@ def parse_args() -> argparse.Namespace:
     return parser.parse_args()
 
 
+async def main(args: argparse.Namespace):
+    try:
+        await BenchmarkRunner(args).run()
+    finally:
+        # Close the tools' shared browser, HTTP clients and worker pools
+        await run_cleanup_handlers()
+
+
 if __name__ == "__main__":
-    args = parse_args()
-    runner = BenchmarkRunner(args)
-    asyncio.run(runner.run())
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    asyncio.run(main(parse_args()))
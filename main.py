@@ -1,11 +1,67 @@
+import argparse
 import asyncio
+import importlib
+from typing import List, Optional
 
-from app.agent import ToolCallAgent
 from app.logger import logger
+from app.utils.shutdown_listener import run_cleanup_handlers
 
 
-async def main():
-    agent = ToolCallAgent()
+try:
+    # A faster drop-in event loop, used when installed
+    import uvloop
+except ImportError:
+    uvloop = None
+
+# Agents and extra tools selectable from the command line, as (module, class name).
+# Only the chosen ones are imported, so unused browser/LLM stacks are never loaded.
+AGENTS = {
+    "toolcall": ("app.agent.toolcall", "ToolCallAgent"),
+    "swe": ("app.agent.swe", "SWEAgent"),
+    "codeact": ("app.agent.codeact", "CodeActAgent"),
+    "midwit": ("app.agent.midwit", "MidwitAgent"),
+    "code_alchemist": ("app.agent.code_alchemist", "CodeAlchemistAgent"),
+    "webcraft": ("app.agent.webcraft", "WebCraftAgent"),
+    "snap_coder": ("app.agent.snap_coder", "SnapCoder"),
+    "operator": ("app.agent.operator", "Operator"),
+}
+TOOLS = {
+    "create_web_template": ("app.tool.create_web_template", "CreateWebTemplate"),
+    "deploy_web_project": ("app.tool.deploy_web_project", "DeployWebProject"),
+    "browser": ("app.tool.browser", "Browser"),
+    "web_read": ("app.tool.web_read", "WebRead"),
+}
+
+
+def _load(module: str, name: str):
+    return getattr(importlib.import_module(module), name)
+
+
+def get_agent(agent_name: str, tool_names: Optional[List[str]] = None):
+    """Create the named agent, adding the named tools to the ones it already has"""
+    agent = _load(*AGENTS[agent_name])()
+    if tool_names:
+        from app.tool import ToolCollection
+
+        extra_tools = [_load(*TOOLS[tool_name])() for tool_name in tool_names]
+        agent.available_tools = ToolCollection(*agent.available_tools, *extra_tools)
+    return agent
+
+
+async def main(args: argparse.Namespace):
+    try:
+        await run(args)
+    finally:
+        # Close the tools' shared browser, HTTP clients and worker pools
+        await run_cleanup_handlers()
+
+
+async def run(args: argparse.Namespace):
+    agent = get_agent(args.agent, args.tools)
+    if args.prompt:
+        await agent.run(args.prompt)
+        return
+
     while True:
         try:
             prompt = input("Enter your prompt (or 'exit' to quit): ")
@@ -19,5 +75,23 @@ async def main():
             break
 
 
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run an AgentHub agent")
+    parser.add_argument("--agent", choices=sorted(AGENTS), default="toolcall")
+    parser.add_argument(
+        "--tools",
+        nargs="+",
+        choices=sorted(TOOLS),
+        help="extra tools to give the agent",
+    )
+    parser.add_argument(
+        "--prompt",
+        help="run this prompt once and exit, instead of prompting interactively",
+    )
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+import app.tool.search_file as search_file
+from app.tool.search_file import (
+    SearchFile,
+    _bytes_pattern,
+    _required_literal,
+    _whole_file_pattern,
+)
+
+
+def _clear_pattern_caches():
+    for func in (_required_literal, _bytes_pattern, _whole_file_pattern):
+        func.cache_clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_pattern_caches():
+    _clear_pattern_caches()
+    yield
+    _clear_pattern_caches()
+
+
+@pytest.mark.parametrize(
+    "regex_pattern, literal",
+    [
+        ("def foo", b"def foo"),
+        ("foo|bar", b""),
+        ("(?i)abc", b""),
+        ("ab*c", b"a"),
+        (r"class \w+Tool", b"class "),
+        ("import (os|sys)", b"import "),
+        ("a\nb", b""),
+        ("héllo", "héllo".encode("utf-8")),
+    ],
+)
+def test_required_literal(regex_pattern, literal):
+    assert _required_literal(regex_pattern) == literal
+
+
+@pytest.mark.parametrize(
+    "regex_pattern, bytes_safe, whole_file",
+    [
+        ("foo", True, True),
+        ("[a-z]+", True, True),
+        ("^def ", True, True),
+        ("foo$", True, True),
+        ("a\nb", True, False),
+        (r"\Afoo", True, False),
+        ("f.o", False, False),
+        (r"\w+", False, False),
+        (r"\bfoo", False, False),
+        ("[^x]", False, False),
+        ("é", False, False),
+    ],
+)
+def test_bytes_and_whole_file_patterns(regex_pattern, bytes_safe, whole_file):
+    assert (_bytes_pattern(regex_pattern) is not None) == bytes_safe
+    assert (_whole_file_pattern(regex_pattern) is not None) == whole_file
+
+
+def test_prefilters_fall_back_without_parser(monkeypatch):
+    monkeypatch.setattr(search_file, "sre_parse", None)
+    assert _required_literal("def foo") == b""
+    assert _bytes_pattern("foo") is None
+    assert _whole_file_pattern("foo") is None
+
+
+def test_search_matches_without_prefilters(tmp_path, monkeypatch):
+    (tmp_path / "a.py").write_text("import os\ndef foo():\n    return 1\n")
+    (tmp_path / "b.py").write_text("x = 1\r\ndef foo_bar():\r\n    pass\r\n")
+    (tmp_path / "c.py").write_text("nothing here\n")
+
+    tool = SearchFile()
+    with_prefilters = asyncio.run(tool.execute(str(tmp_path), r"def foo\w*", "*.py"))
+    _clear_pattern_caches()
+    monkeypatch.setattr(search_file, "sre_parse", None)
+    without_prefilters = asyncio.run(tool.execute(str(tmp_path), r"def foo\w*", "*.py"))
+
+    assert with_prefilters == without_prefilters
+    assert "Found 2 results." in with_prefilters